@@ -7,14 +7,33 @@ python
 # Imports
 import os
 import sys
+import argparse
+import cProfile
+import functools
+import hashlib
 import logging
+import resource
+import time
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from mpl_toolkits.mplot3d import Axes3D
-from sklearn.decomposition import PCA, TSNE
+from sklearn.decomposition import PCA, IncrementalPCA
+from sklearn.ensemble import IsolationForest
+from sklearn.manifold import TSNE
+from sklearn.neighbors import KNeighborsRegressor
 from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+import joblib
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
 import requests
 import json
 
@@ -22,11 +41,48 @@ import json
 API_URL = "https://example-api.com/data-integrity"
 API_KEY = "YOUR_API_KEY_HERE"
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+DATE_COLUMN = "date_column"
+DATE_FORMATS = (DATE_FORMAT, "ISO8601")  # tried in this order
+DATE_ORDER_FORMATS = (
+    ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y"),  # day first
+    ("%m/%d/%Y %H:%M:%S", "%m/%d/%Y"),  # month first
+)  # one of these per column and source, preferred in this order
+DATE_FORMAT_CACHE_ENTRIES = 256  # (source, column) pairs remembered by convert_date_format(), least recently used go first
+EPOCH_UNITS = ((1e11, "s"), (1e14, "ms"), (1e17, "us"))  # largest magnitude below the bound -> unit, else ns
 MISSING_VALUE_PLACEHOLDER = "N/A"
+CSV_CHUNK_SIZE = 100_000  # rows per chunk in streaming mode
+CSV_DTYPES = {"value": "float64", "anomaly_score": "float32", "anomaly": "bool"}
+MAX_PLOT_POINTS = 100_000  # rows kept per visualisation stage in streaming mode
+TIME_SERIES_COLUMNS = ["time", "value", "anomaly"]
+TIME_SERIES_PLOT_POINTS = 5000  # about four points per horizontal pixel of the 12in x 100dpi figure
+SCORE_HISTOGRAM_BINS = 50
+SCORE_HISTOGRAM_RANGE = None  # fixed (low, high) grid for mergeable summaries; None = range of the first chunk
+SCORE_HISTOGRAM_RESOLUTION = 16  # grid cells per histogram bin, so a widened range can be re-binned finely
+SCORE_SKETCH_SIZE = 1000  # items per quantile sketch level; rank error shrinks roughly as 1/size
+DR_ROW_BUDGET = 20_000  # rows fitted by the sampled reducers; t-SNE cost grows faster than linearly
+DR_ANOMALY_FRACTION = 0.5  # share of the row budget reserved for anomalous rows
+DR_BATCH_SIZE = 10_000  # rows per IncrementalPCA batch and per projection batch
+DR_NEIGHBORS = 10  # sampled neighbours used to place each unsampled row in the t-SNE embedding
+TSNE_PERPLEXITY = 30.0
+CACHEABLE_TECHNIQUES = ("pca", "randomized_pca", "incremental_pca")  # reducers with a transform step
+SCORE_METHOD = "zscore"  # used when the input has no anomaly_score/anomaly columns
+SCORE_WINDOW = 100  # trailing rows, current one included, for the rolling scores
+SCORE_BLOCK_ROWS = 10_000  # windows reduced at once; bounds the temporary to rows x window floats
+ANOMALY_THRESHOLDS = {"zscore": 3.0, "mad": 3.5, "isolation_forest": 0.6}
+MAD_SCALE = 1.4826  # makes the MAD a consistent estimate of the standard deviation for normal data
+MEAN_AD_SCALE = 1.2533  # the same for the mean absolute deviation, used when the MAD is zero
+COLUMNAR_SUFFIXES = (".parquet", ".feather", ".arrow")
+CACHE_CONVERTED_INPUT = False  # write an uncompressed Feather copy next to a CSV input on first read
 
 # Variables
 data_path = "data/"
 output_path = "output/"
+reducer_cache_path = None  # directory for fitted reducers, see fit_transform_cached(); None disables the cache
+headless_render = False  # draw on plain Agg Figures and never call plt.show()
+stage_timings = []  # one record per profile_stage call, see write_timing_report()
+profiled_stages = set()  # stage names run under cProfile
+_active_profiler = None  # the cProfile.Profile of the outermost profiled stage running now
+date_format_cache = OrderedDict()  # (source, column) -> formats that matched, see convert_date_format()
 anomaly_scores = []
 time_series_data = []
 multi_dim_data = []
@@ -49,117 +105,960 @@ def handle_exception(func):
 
     return wrapper
 
+# Stage Profiling
+def _row_count(value):
+    if isinstance(value, tuple) and value:
+        return _row_count(value[0])
+    if isinstance(value, ScoreSummary):
+        return int(value.count)
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray, list)):
+        return len(value)
+    return None
+
+def profile_stage(func):
+    """
+    Record wall time, CPU time, peak RSS growth and rows of every call in stage_timings.
+
+    Rows are those of the first argument, or of the result when the input has
+    no length (e.g. a file path). CPU time is that of this process only.
+    Stages named in profiled_stages also run under cProfile and dump their
+    statistics to output_path as <stage>.pstats, unless they are nested in a
+    stage that is already being profiled; they are then only timed, and show
+    up in the outer stage's statistics. Apply it below handle_exception so
+    the stage keeps its own name.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        global _active_profiler
+        profiler = None
+        if func.__name__ in profiled_stages and _active_profiler is None:
+            profiler = _active_profiler = cProfile.Profile()
+        record = {"stage": func.__name__, "rows": _row_count(args[0]) if args else None, "status": "failed"}
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            result = func(*args, **kwargs)
+            record["status"] = "ok"
+            if record["rows"] is None:
+                record["rows"] = _row_count(result)
+            return result
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                _active_profiler = None
+                profiler.dump_stats(os.path.join(output_path, f"{func.__name__}.pstats"))
+            record["wall_time"] = time.perf_counter() - wall_start
+            record["cpu_time"] = time.process_time() - cpu_start
+            record["peak_rss_delta_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+            stage_timings.append(record)
+
+    return wrapper
+
+def write_timing_report(path=None):
+    """
+    Write the stage timings of this run as JSON, per call and summed per stage.
+
+    Args:
+        path (str, optional): Report file. Defaults to timing_report.json in output_path.
+
+    Returns:
+        dict: The report
+    """
+    stages = {}
+    for record in stage_timings:
+        summary = stages.setdefault(record["stage"], {"calls": 0, "wall_time": 0.0, "cpu_time": 0.0, "peak_rss_delta_kb": 0, "rows": 0})
+        summary["calls"] += 1
+        summary["wall_time"] += record["wall_time"]
+        summary["cpu_time"] += record["cpu_time"]
+        summary["peak_rss_delta_kb"] += record["peak_rss_delta_kb"]
+        summary["rows"] += record["rows"] or 0
+    report = {"created": datetime.now().strftime(DATE_FORMAT), "stages": stages, "calls": stage_timings}
+    path = path or os.path.join(output_path, "timing_report.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    logging.info(f"Timing report written to {path}")
+    return report
+
+# Figure Output
+def _new_figure(figsize):
+    # Headless figures live outside pyplot's global state and render on Agg
+    if headless_render:
+        return Figure(figsize=figsize)
+    return plt.figure(figsize=figsize)
+
+def _save_figure(fig, filename):
+    fig.savefig(os.path.join(output_path, filename))
+    if not headless_render:
+        plt.show()
+
+# Anomaly Scoring
+def rolling_scores(values, window=SCORE_WINDOW, method="zscore"):
+    """
+    Score every value against the trailing window that ends at it.
+
+    "zscore" is the distance from the window mean in standard deviations,
+    "mad" the distance from the window median in scaled median absolute
+    deviations (the scaled mean absolute deviation stands in where the MAD is
+    zero). The first window - 1 values use the shorter windows available and
+    NaN values are ignored by the statistics and get a NaN score. Work is
+    done on strided window views, SCORE_BLOCK_ROWS windows at a time.
+
+    Args:
+        values (array-like): Values in time order
+        window (int, optional): Window length. Defaults to SCORE_WINDOW.
+        method (str, optional): "zscore" or "mad". Defaults to "zscore".
+
+    Returns:
+        np.ndarray: Non-negative score per value
+    """
+    if method not in ("zscore", "mad"):
+        raise ValueError(f"Unknown rolling score method: {method}")
+    values = np.asarray(values, dtype=np.float64)
+    windows = sliding_window_view(np.concatenate([np.full(window - 1, np.nan), values]), window)
+    scores = np.empty(len(values))
+
+    for start in range(0, len(values), SCORE_BLOCK_ROWS):
+        block = windows[start:start + SCORE_BLOCK_ROWS]
+        current = values[start:start + SCORE_BLOCK_ROWS]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN windows
+            if not np.isnan(block).any():
+                mean, median = np.mean, np.median
+            else:
+                mean, median = np.nanmean, np.nanmedian
+            if method == "zscore":
+                centre = mean(block, axis=1)
+                spread = np.sqrt(mean((block - centre[:, None]) ** 2, axis=1))
+            else:
+                centre = median(block, axis=1)
+                deviations = np.abs(block - centre[:, None])
+                spread = MAD_SCALE * median(deviations, axis=1)
+                spread = np.where(spread > 0, spread, MEAN_AD_SCALE * mean(deviations, axis=1))
+
+        distance = np.abs(current - centre)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores[start:start + len(current)] = np.where(spread > 0, distance / spread, np.where(np.isnan(distance), np.nan, 0.0))
+    return scores
+
+def _isolation_features(data):
+    features = data.drop(TIME_SERIES_COLUMNS + ["anomaly_score"], axis=1, errors="ignore").select_dtypes("number")
+    if features.empty:
+        features = data[["value"]]
+    return features.to_numpy(dtype=np.float64)
+
+def _rolling_scores_chunk(values, skip, window, method):
+    return rolling_scores(values, window, method)[skip:]
+
+def _isolation_scores_chunk(model, features):
+    # score_samples is the negated anomaly score of the isolation forest paper:
+    # close to 1 for anomalies, well below 0.5 for normal rows
+    return -model.score_samples(features)
+
+def _map_chunks(func, jobs, n_jobs=None):
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+    if not n_jobs or n_jobs == 1 or len(jobs) == 1:
+        return [func(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        return list(pool.map(func, *zip(*jobs)))
+
+@handle_exception
+@profile_stage
+def score_anomalies(data, method=SCORE_METHOD, window=SCORE_WINDOW, threshold=None, n_jobs=None, chunk_size=CSV_CHUNK_SIZE):
+    """
+    Compute the anomaly_score and anomaly columns.
+
+    "zscore" and "mad" score the value column with rolling_scores();
+    "isolation_forest" fits an IsolationForest on the multi-dimensional
+    numeric columns (value alone when there are none). Rows are scored in
+    chunks of chunk_size, each rolling chunk carrying the window - 1 rows
+    before it, so the result does not depend on the chunking and chunks can
+    run in n_jobs processes.
+
+    Args:
+        data (pd.DataFrame): Data with time and value columns
+        method (str, optional): "zscore", "mad" or "isolation_forest". Defaults to SCORE_METHOD.
+        window (int, optional): Rolling window length. Defaults to SCORE_WINDOW.
+        threshold (float, optional): Scores above it are anomalies. Defaults to ANOMALY_THRESHOLDS[method].
+        n_jobs (int, optional): Worker processes, -1 for all cores. Defaults to None (in process).
+        chunk_size (int, optional): Rows per scoring chunk. Defaults to CSV_CHUNK_SIZE.
+
+    Returns:
+        pd.DataFrame: Copy of data with anomaly_score and anomaly columns
+    """
+    if method not in ANOMALY_THRESHOLDS:
+        raise ValueError(f"Unknown scoring method: {method}")
+    threshold = ANOMALY_THRESHOLDS[method] if threshold is None else threshold
+    starts = range(0, len(data), chunk_size)
+
+    if method == "isolation_forest":
+        features = _isolation_features(data)
+        model = IsolationForest(random_state=42, n_jobs=n_jobs).fit(features)
+        jobs = [(model, features[start:start + chunk_size]) for start in starts]
+        scores = _map_chunks(_isolation_scores_chunk, jobs, n_jobs)
+    else:
+        values = data["value"].to_numpy(dtype=np.float64)
+        jobs = []
+        for start in starts:
+            context = min(start, window - 1)
+            jobs.append((values[start - context:start + chunk_size], context, window, method))
+        scores = _map_chunks(_rolling_scores_chunk, jobs, n_jobs)
+
+    scores = np.concatenate(scores) if scores else np.empty(0)
+    scored = data.copy()
+    scored["anomaly_score"] = scores
+    scored["anomaly"] = scores > threshold
+    logging.info(f"Scored {len(scored)} rows with {method}: {int(scored['anomaly'].sum())} anomalies")
+    return scored
+
+class AnomalyScorer:
+    """
+    Streaming form of score_anomalies() for DataFrame chunks.
+
+    Rolling methods keep the last window - 1 values between chunks, so the
+    scores match a single score_anomalies() call on the whole file. The
+    isolation forest is fitted on the first chunk and reused for the rest.
+
+    Args:
+        method (str, optional): "zscore", "mad" or "isolation_forest". Defaults to SCORE_METHOD.
+        window (int, optional): Rolling window length. Defaults to SCORE_WINDOW.
+        threshold (float, optional): Scores above it are anomalies. Defaults to ANOMALY_THRESHOLDS[method].
+    """
+
+    def __init__(self, method=SCORE_METHOD, window=SCORE_WINDOW, threshold=None):
+        if method not in ANOMALY_THRESHOLDS:
+            raise ValueError(f"Unknown scoring method: {method}")
+        self.method = method
+        self.window = window
+        self.threshold = ANOMALY_THRESHOLDS[method] if threshold is None else threshold
+        self._tail = np.empty(0)
+        self._model = None
+
+    def update(self, chunk):
+        if len(chunk) == 0:
+            return chunk.assign(anomaly_score=np.empty(0), anomaly=np.empty(0, dtype=bool))
+        if self.method == "isolation_forest":
+            features = _isolation_features(chunk)
+            if self._model is None:
+                self._model = IsolationForest(random_state=42).fit(features)
+            scores = _isolation_scores_chunk(self._model, features)
+        else:
+            values = np.concatenate([self._tail, chunk["value"].to_numpy(dtype=np.float64)])
+            scores = _rolling_scores_chunk(values, len(self._tail), self.window, self.method)
+            self._tail = values[len(values) - (self.window - 1):] if self.window > 1 else np.empty(0)
+        chunk = chunk.copy()
+        chunk["anomaly_score"] = scores
+        chunk["anomaly"] = scores > self.threshold
+        return chunk
+
+# Streaming Anomaly Score Summary
+class ScoreSummary:
+    """
+    Mergeable, fixed-memory summary of anomaly scores for the histogram and box plot.
+
+    Scores are counted on a grid of equal-width cells, SCORE_HISTOGRAM_RESOLUTION
+    per histogram bin. With a value_range the grid spans exactly that range.
+    Without one, the first update picks a power-of-two cell width for its
+    range and aligns the cells to multiples of it, so grids picked by
+    different workers nest into each other. Values outside the grid are
+    counted in extra cells on it, so nothing is clipped. The histogram
+    spreads the occupied range over `bins` bars, splitting a cell that
+    straddles a bar edge in proportion to its overlap. Quartiles and whiskers
+    come from a KLL-style quantile sketch: levels of at most sketch_size
+    items, where level h items stand for 2**h scores, halved by random
+    compaction when full. Summaries without a value_range can always be
+    merged, the finer grid being coarsened exactly to the wider one;
+    summaries with a value_range merge only with the same value_range.
+
+    Args:
+        bins (int, optional): Number of histogram bins. Defaults to SCORE_HISTOGRAM_BINS.
+        value_range (tuple, optional): (low, high) of the histogram grid. Defaults to SCORE_HISTOGRAM_RANGE.
+        sketch_size (int, optional): Items per sketch level. Defaults to SCORE_SKETCH_SIZE.
+        seed (int, optional): Random seed of the sketch compaction. Defaults to None.
+    """
+
+    def __init__(self, bins=SCORE_HISTOGRAM_BINS, value_range=SCORE_HISTOGRAM_RANGE,
+                 sketch_size=SCORE_SKETCH_SIZE, seed=None):
+        self.bins = bins
+        self.cells = bins * SCORE_HISTOGRAM_RESOLUTION
+        self.sketch_size = sketch_size
+        self.fixed = value_range is not None
+        self.origin = self.width = None
+        if self.fixed:
+            self._set_grid(*value_range)
+        self.counts = np.zeros(self.cells, dtype=np.int64)
+        self.outside = {}  # cell index outside [0, cells) -> count
+        self.count = 0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _set_grid(self, low, high):
+        if low == high:
+            low, high = low - 0.5, high + 0.5  # same convention as np.histogram
+        self.origin = float(low)
+        self.width = (float(high) - float(low)) / self.cells
+
+    def _set_lattice(self, low, width):
+        self.width = float(width)
+        self.origin = float(np.floor(low / self.width) * self.width)
+
+    def _lattice_cells(self, width):
+        # Occupied cells as indices on the lattice of a coarser power-of-two width, with their counts
+        inside = np.flatnonzero(self.counts)
+        cells = np.concatenate([inside, np.fromiter(self.outside.keys(), dtype=np.int64, count=len(self.outside))])
+        counts = np.concatenate([self.counts[inside], np.fromiter(self.outside.values(), dtype=np.int64, count=len(self.outside))])
+        cells += int(round(self.origin / self.width))
+        return cells // int(round(width / self.width)), counts
+
+    def _add_cells(self, index, counts=None):
+        inside = (index >= 0) & (index < self.cells)
+        weights = None if counts is None else counts[inside]
+        self.counts += np.bincount(index[inside], weights, minlength=self.cells).astype(np.int64)
+        cells, position = np.unique(index[~inside], return_inverse=True)
+        weights = None if counts is None else counts[~inside]
+        for cell, cell_count in zip(cells.tolist(), np.bincount(position, weights, minlength=len(cells)).tolist()):
+            self.outside[cell] = self.outside.get(cell, 0) + int(cell_count)
+
+    def update(self, values):
+        """
+        Add a chunk of scores. NaNs are ignored.
+
+        Args:
+            values (array-like): Anomaly scores
+
+        Returns:
+            ScoreSummary: self
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        if self.origin is None:
+            span = values.max() - values.min()
+            self._set_lattice(values.min(), 2.0 ** np.ceil(np.log2((span or 1.0) / self.cells)))
+
+        index = np.floor((values - self.origin) / self.width).astype(np.int64)
+        if self.fixed:
+            index[(index == self.cells) & (values <= self.origin + self.cells * self.width)] = self.cells - 1
+        self._add_cells(index)
+
+        self.count += len(values)
+        self.minimum = min(self.minimum, values.min())
+        self.maximum = max(self.maximum, values.max())
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Fold another summary, e.g. from a worker process, into this one.
+
+        Args:
+            other (ScoreSummary): Summary with the same bins and value_range
+
+        Returns:
+            ScoreSummary: self
+        """
+        if other.origin is not None:
+            if self.origin is None:
+                self.fixed, self.origin, self.width = other.fixed, other.origin, other.width
+            if (self.origin, self.width, self.cells) == (other.origin, other.width, other.cells):
+                self.counts += other.counts
+                for cell, cell_count in other.outside.items():
+                    self.outside[cell] = self.outside.get(cell, 0) + cell_count
+            elif self.fixed or other.fixed or self.cells != other.cells:
+                raise ValueError("Cannot merge score summaries built on different histogram grids")
+            else:
+                width = max(self.width, other.width)
+                own_cells, own_counts = self._lattice_cells(width)
+                other_cells, other_counts = other._lattice_cells(width)
+                self._set_lattice(self.origin, width)
+                self.counts = np.zeros(self.cells, dtype=np.int64)
+                self.outside = {}
+                base = int(round(self.origin / self.width))
+                self._add_cells(own_cells - base, own_counts)
+                self._add_cells(other_cells - base, other_counts)
+        self.count += other.count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        for level, items in enumerate(other._levels):
+            if level == len(self._levels):
+                self._levels.append(np.empty(0))
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self._compress()
+        return self
+
+    def _compress(self):
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) > self.sketch_size:
+                items = np.sort(items)
+                leftover = np.empty(0)
+                if len(items) % 2:
+                    position = self._rng.integers(len(items))
+                    leftover = items[position:position + 1]
+                    items = np.delete(items, position)
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], items[self._rng.integers(2)::2]])
+                self._levels[level] = leftover
+            level += 1
+
+    def quantiles(self, fractions):
+        """
+        Estimate quantiles of the scores seen so far; exact until the sketch first compacts.
+
+        Args:
+            fractions (list of float): Quantiles in [0, 1]
+
+        Returns:
+            np.ndarray: Estimated score at each quantile
+        """
+        fractions = np.asarray(fractions, dtype=np.float64)
+        if len(self._levels) == 1:
+            return np.percentile(self._levels[0], fractions * 100)
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(level_items), 2 ** level) for level, level_items in enumerate(self._levels)])
+        order = np.argsort(items)
+        items, cumulative = items[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, fractions * cumulative[-1], side="left")
+        estimates = items[np.minimum(positions, len(items) - 1)]
+        estimates[fractions <= 0] = self.minimum
+        estimates[fractions >= 1] = self.maximum
+        return estimates
+
+    def histogram(self):
+        """
+        Histogram counts and edges with `bins` bars.
+
+        With a value_range the bars are exactly its bins while every score
+        lies inside it, and the histogram widens to cover any scores outside.
+        Without one, the bars span the occupied cells. Cells straddling a bar
+        edge are split proportionally, so each bar is then off by at most one
+        cell at either edge.
+
+        Returns:
+            tuple: (counts, edges) as np.ndarrays
+        """
+        if self.fixed and not self.outside:
+            edges = self.origin + np.arange(self.bins + 1) * (self.width * SCORE_HISTOGRAM_RESOLUTION)
+            return self.counts.reshape(self.bins, -1).sum(axis=1), edges
+        occupied, occupied_counts = self._lattice_cells(self.width)
+        occupied -= int(round(self.origin / self.width))
+        low, high = occupied.min(), occupied.max()
+        if self.fixed:
+            low, high = min(0, low), max(self.cells - 1, high)
+        cells = np.zeros(high - low + 1, dtype=np.int64)
+        cells[occupied - low] = occupied_counts
+        cell_edges = self.origin + (low + np.arange(len(cells) + 1)) * self.width
+        edges = np.linspace(cell_edges[0], cell_edges[-1], self.bins + 1)
+        cumulative = np.interp(edges, cell_edges, np.concatenate([[0], np.cumsum(cells)]))
+        return np.diff(np.round(cumulative).astype(np.int64)), edges
+
+    def box_stats(self):
+        """
+        Box plot statistics in the format of matplotlib's Axes.bxp.
+
+        Whiskers reach the most extreme sketch item within 1.5 IQR of the box;
+        the exact minimum and maximum are drawn as fliers when they lie beyond.
+
+        Returns:
+            dict: med, q1, q3, whislo, whishi and fliers
+        """
+        q1, median, q3 = self.quantiles([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        items = np.concatenate(self._levels)
+        inner = items[(items >= q1 - 1.5 * iqr) & (items <= q3 + 1.5 * iqr)]
+        whislo = inner.min() if len(inner) else q1
+        whishi = inner.max() if len(inner) else q3
+        fliers = [value for value in (self.minimum, self.maximum) if value < whislo or value > whishi]
+        return {"med": median, "q1": q1, "q3": q3, "whislo": whislo, "whishi": whishi, "fliers": fliers}
+
+
 # Anomaly Scoring Visualizations
 @handle_exception
+@profile_stage
 def visualize_anomaly_scores(data):
     """
     Generate histograms and box plots to illustrate anomaly score distribution.
 
     Args:
-        data (list): Anomaly scores
+        data (list, ScoreSummary or str): Anomaly scores, a streaming summary of them,
+            or an input file whose anomaly_score column is loaded with load_data()
 
     Returns:
         None
     """
-    plt.figure(figsize=(10, 5))
+    if isinstance(data, str):
+        data = load_data(data, columns=["anomaly_score"])["anomaly_score"].to_numpy()
+    summary = data if isinstance(data, ScoreSummary) else ScoreSummary().update(data)
+    if summary.count == 0:
+        logging.warning("No anomaly scores to visualize")
+        return
+    counts, edges = summary.histogram()
+
+    fig = _new_figure((10, 5))
+    hist_ax, box_ax = fig.subplots(1, 2)
+
+    hist_ax.hist(edges[:-1], bins=edges, weights=counts, alpha=0.7, color="g", edgecolor="black")
+    hist_ax.set_title("Anomaly Score Histogram")
+    hist_ax.set_xlabel("Score")
+    hist_ax.set_ylabel("Frequency")
+
+    box_ax.bxp([summary.box_stats()], orientation="horizontal")
+    box_ax.set_title("Anomaly Score Box Plot")
+    box_ax.set_xlabel("Score")
+
+    fig.tight_layout()
+    _save_figure(fig, "anomaly_scores.png")
+
+# Time-Series Downsampling
+def downsample_time_series(data, max_points=TIME_SERIES_PLOT_POINTS):
+    """
+    Shape-preserving downsampling of a time series for plotting (M4 bucketing).
+
+    The rows are split into max_points // 4 equal-count buckets in their
+    current order, and the first, last, minimum and maximum value of each
+    bucket are kept, so peaks, troughs and the line envelope render the same
+    as with every point. Rows flagged as anomalies are always kept.
+
+    Args:
+        data (pd.DataFrame): Time-series data with "value" and "anomaly" columns
+        max_points (int, optional): Approximate point budget, excluding anomaly rows. Defaults to TIME_SERIES_PLOT_POINTS.
+
+    Returns:
+        pd.DataFrame: The selected rows in their original order
+    """
+    rows = len(data)
+    buckets = max(1, max_points // 4)
+    if rows <= max(max_points, 4):
+        return data
+    size = -(-rows // buckets)
+    buckets = -(-rows // size)
+    values = data["value"].to_numpy(dtype=np.float64)
+    padded = np.full(buckets * size, np.nan)
+    padded[:rows] = values
+    padded = padded.reshape(buckets, size)
+    starts = np.arange(buckets) * size
+    minimum = np.where(np.isnan(padded), np.inf, padded).argmin(axis=1) + starts
+    maximum = np.where(np.isnan(padded), -np.inf, padded).argmax(axis=1) + starts
+    last = np.minimum(starts + size, rows) - 1
+    anomalies = np.flatnonzero(data["anomaly"].to_numpy(dtype=bool))
+    keep = np.unique(np.concatenate([starts, last, minimum, maximum, anomalies]))
+    return data.iloc[keep]
+
+
+class TimeSeriesDownsampler:
+    """
+    Streaming stage that keeps a downsampled copy of a time series, chunk by chunk.
+
+    Each chunk is appended to the points kept so far and the result is
+    downsampled back to max_points, so global extremes and all anomaly rows
+    survive while memory stays bounded.
+
+    Args:
+        max_points (int): Point budget kept between chunks
+    """
+
+    def __init__(self, max_points):
+        self.max_points = max_points
+        self.rows_seen = 0
+        self._kept = None
 
-    plt.subplot(1, 2, 1)
-    plt.hist(data, bins=50, alpha=0.7, color="g", edgecolor="black")
-    plt.title("Anomaly Score Histogram")
-    plt.xlabel("Score")
-    plt.ylabel("Frequency")
+    def update(self, frame):
+        self.rows_seen += len(frame)
+        if self._kept is not None:
+            frame = pd.concat([self._kept, frame], ignore_index=True)
+        self._kept = downsample_time_series(frame, self.max_points).reset_index(drop=True)
 
-    plt.subplot(1, 2, 2)
-    plt.boxplot(data, vert=False)
-    plt.title("Anomaly Score Box Plot")
-    plt.xlabel("Score")
+    def result(self):
+        return self._kept
 
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_path, "anomaly_scores.png"))
-    plt.show()
 
 # Time-Series Anomaly Visualization
 @handle_exception
-def visualize_time_series_anomalies(data):
+@profile_stage
+def visualize_time_series_anomalies(data, max_points=TIME_SERIES_PLOT_POINTS):
     """
     Create interactive time-series plots to showcase anomalies.
 
     Args:
-        data (pd.DataFrame): Time-series data with anomaly column
+        data (pd.DataFrame or str): Time-series data with anomaly column, or an input file
+            whose TIME_SERIES_COLUMNS are loaded with load_data()
+        max_points (int, optional): Point budget for the line; longer series are
+            downsampled with downsample_time_series(). None plots every point.
+            Defaults to TIME_SERIES_PLOT_POINTS.
 
     Returns:
         None
     """
-    plt.figure(figsize=(12, 6))
-    plt.plot(data["time"], data["value"], label="Normal")
-    plt.plot(data["time"][data["anomaly"]], data["value"][data["anomaly"]], label="Anomaly", marker="o", linestyle="None", color="red")
-    plt.title("Time-Series Anomaly Visualization")
-    plt.xlabel("Time")
-    plt.ylabel("Value")
-    plt.legend()
-    plt.savefig(os.path.join(output_path, "time_series_anomalies.png"))
-    plt.show()
+    if isinstance(data, str):
+        data = load_data(data, columns=TIME_SERIES_COLUMNS)
+    if max_points is not None:
+        data = downsample_time_series(data, max_points)
+    fig = _new_figure((12, 6))
+    ax = fig.add_subplot(111)
+    ax.plot(data["time"], data["value"], label="Normal")
+    ax.plot(data["time"][data["anomaly"]], data["value"][data["anomaly"]], label="Anomaly", marker="o", linestyle="None", color="red")
+    ax.set_title("Time-Series Anomaly Visualization")
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Value")
+    ax.legend()
+    _save_figure(fig, "time_series_anomalies.png")
 
 # Multi-Dimensional Anomaly Representation
-@handle_exception
-def visualize_multi_dim_anomalies(data, technique="pca"):
+def stratified_sample_positions(rows, anomaly=None, budget=DR_ROW_BUDGET, anomaly_fraction=DR_ANOMALY_FRACTION, seed=42):
     """
-    Utilize dimensionality reduction techniques to visualize high-dimensional data.
+    Pick at most budget row positions, oversampling anomalous rows.
+
+    Up to anomaly_fraction of the budget goes to anomalous rows and the rest
+    is filled with a uniform sample of the normal rows. Without anomaly
+    flags the whole budget is a uniform sample.
+
+    Args:
+        rows (int): Number of rows to sample from
+        anomaly (array-like, optional): Boolean anomaly flag per row. Defaults to None.
+        budget (int, optional): Maximum number of positions. Defaults to DR_ROW_BUDGET.
+        anomaly_fraction (float, optional): Share of the budget for anomalies. Defaults to DR_ANOMALY_FRACTION.
+        seed (int, optional): Random seed. Defaults to 42.
+
+    Returns:
+        np.ndarray: Sorted row positions
+    """
+    if rows <= budget:
+        return np.arange(rows)
+    rng = np.random.default_rng(seed)
+    if anomaly is None:
+        return np.sort(rng.choice(rows, budget, replace=False))
+
+    flags = np.asarray(anomaly, dtype=bool)
+    anomalous = np.flatnonzero(flags)
+    normal = np.flatnonzero(~flags)
+    n_anomalous = min(len(anomalous), int(budget * anomaly_fraction))
+    n_normal = min(len(normal), budget - n_anomalous)
+    positions = np.concatenate([
+        rng.choice(anomalous, n_anomalous, replace=False),
+        rng.choice(normal, n_normal, replace=False),
+    ])
+    return np.sort(positions)
+
+def _tsne(rows, n_jobs=None):
+    return TSNE(n_components=3, random_state=42, n_jobs=n_jobs, perplexity=min(TSNE_PERPLEXITY, rows - 1))
+
+def _sampled_tsne(data, n_jobs=None, row_budget=DR_ROW_BUDGET, anomaly=None):
+    # Fit t-SNE on a stratified sample and place every other row at the
+    # distance-weighted mean embedding of its nearest sampled neighbours.
+    values = data.to_numpy(dtype=np.float64)
+    positions = stratified_sample_positions(len(values), anomaly, row_budget)
+    sample = values[positions]
+    embedding = _tsne(len(sample), n_jobs).fit_transform(sample)
+    if len(positions) == len(values):
+        return embedding
+
+    projector = KNeighborsRegressor(n_neighbors=min(DR_NEIGHBORS, len(sample)), weights="distance", n_jobs=n_jobs)
+    projector.fit(sample, embedding)
+    reduced = np.empty((len(values), 3))
+    reduced[positions] = embedding
+    rest = np.setdiff1d(np.arange(len(values)), positions, assume_unique=True)
+    for start in range(0, len(rest), DR_BATCH_SIZE):
+        batch = rest[start:start + DR_BATCH_SIZE]
+        reduced[batch] = projector.predict(values[batch])
+    return reduced
+
+def _incremental_pca_chunks(chunks, row_budget=DR_ROW_BUDGET):
+    # One pass over the chunks: every row updates the components, a reservoir
+    # sample of row_budget rows is kept for plotting. A batch is fitted once
+    # the next one is known, so trailing rows fewer than n_components are
+    # folded into the last partial_fit instead of being dropped.
+    reducer = IncrementalPCA(n_components=3)
+    sample = ReservoirSample(row_budget)
+    ready = pending = None
+    for chunk in chunks:
+        sample.update(chunk)
+        pending = chunk if pending is None else pd.concat([pending, chunk], ignore_index=True)
+        if len(pending) >= reducer.n_components:
+            if ready is not None:
+                reducer.partial_fit(ready)
+            ready, pending = pending, None
+    if pending is not None:
+        ready = pending if ready is None else pd.concat([ready, pending], ignore_index=True)
+    if ready is None:
+        return np.empty((0, reducer.n_components))
+    if len(ready) < reducer.n_components:
+        # Fewer rows than components in the whole input: plain PCA, padded to three columns
+        reduced = PCA(n_components=min(ready.shape)).fit_transform(ready)
+        return np.pad(reduced, ((0, 0), (0, reducer.n_components - reduced.shape[1])))
+    reducer.partial_fit(ready)
+    return reducer.transform(sample.result())
+
+def _fit_reducer(data, technique, row_budget=DR_ROW_BUDGET, anomaly=None):
+    if technique == "randomized_pca":
+        reducer = PCA(n_components=3, svd_solver="randomized", random_state=42)
+        positions = stratified_sample_positions(len(data), anomaly, row_budget)
+        return reducer.fit(data.iloc[positions])
+    if technique == "incremental_pca":
+        return IncrementalPCA(n_components=3, batch_size=DR_BATCH_SIZE).fit(data)
+    return PCA(n_components=3).fit(data)
+
+def _fingerprint(row_hashes):
+    return hashlib.sha1(row_hashes.tobytes()).hexdigest()
+
+def _reducer_cache_file(cache_path, technique, data):
+    schema = json.dumps([technique] + [[str(column), str(dtype)] for column, dtype in data.dtypes.items()])
+    return os.path.join(cache_path, f"{technique}-{hashlib.sha1(schema.encode()).hexdigest()[:16]}.joblib")
+
+def _store_reducer(path, reducer, row_hashes):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    entry = {"reducer": reducer, "rows": len(row_hashes), "fingerprint": _fingerprint(row_hashes)}
+    joblib.dump(entry, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+def fit_transform_cached(data, technique, cache_path=None, row_budget=DR_ROW_BUDGET, anomaly=None):
+    """
+    Fit a PCA-family reducer, reusing a fitted one from disk when the data allows it.
+
+    Reducers are stored with joblib in cache_path, one file per technique and
+    column schema (names and dtypes), together with the number of rows they
+    were fitted on and a fingerprint of those rows. If the data still starts
+    with exactly those rows the stored reducer is reused: unchanged data only
+    runs transform, and appended rows are folded in with partial_fit where
+    the reducer supports it. Anything else refits and replaces the entry.
 
     Args:
         data (pd.DataFrame): High-dimensional data
+        technique (str): One of CACHEABLE_TECHNIQUES
+        cache_path (str, optional): Cache directory; None disables the cache. Defaults to None.
+        row_budget (int, optional): Rows fitted by randomized_pca. Defaults to DR_ROW_BUDGET.
+        anomaly (array-like, optional): Boolean anomaly flag per row. Defaults to None.
+
+    Returns:
+        np.ndarray: Reduced data with three columns
+    """
+    if cache_path is None:
+        return _fit_reducer(data, technique, row_budget, anomaly).transform(data)
+
+    path = _reducer_cache_file(cache_path, technique, data)
+    row_hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    entry = None
+    if os.path.exists(path):
+        try:
+            entry = joblib.load(path)
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable reducer cache {path}: {str(e)}")
+
+    if entry is not None and entry["rows"] <= len(data) and entry["fingerprint"] == _fingerprint(row_hashes[: entry["rows"]]):
+        reducer = entry["reducer"]
+        appended = data.iloc[entry["rows"]:]
+        if appended.empty:
+            logging.info(f"Reusing cached {technique} reducer from {path}")
+            return reducer.transform(data)
+        if hasattr(reducer, "partial_fit") and len(appended) >= reducer.n_components:
+            logging.info(f"Updating cached {technique} reducer with {len(appended)} appended rows")
+            reducer.partial_fit(appended)
+            _store_reducer(path, reducer, row_hashes)
+            return reducer.transform(data)
+
+    reducer = _fit_reducer(data, technique, row_budget, anomaly)
+    _store_reducer(path, reducer, row_hashes)
+    return reducer.transform(data)
+
+def reduce_dimensions(data, technique="pca", n_jobs=None, row_budget=DR_ROW_BUDGET, anomaly=None, cache_path=None):
+    """
+    Project high-dimensional data onto three components.
+
+    "pca" and "tsne" fit on every row. "randomized_pca" fits a randomized SVD
+    on at most row_budget rows and projects all of them. "incremental_pca"
+    fits in batches of DR_BATCH_SIZE rows; given an iterable of DataFrames
+    instead of a DataFrame it makes a single pass and returns a sample of
+    row_budget rows. "tsne_sample" fits t-SNE on a stratified sample that
+    oversamples anomalies and places the remaining rows by nearest neighbours.
+    With a cache_path the PCA-family reducers are reused across runs, see
+    fit_transform_cached.
+
+    Args:
+        data (pd.DataFrame or iterable of pd.DataFrame): High-dimensional data
         technique (str, optional): Dimensionality reduction technique. Defaults to "pca".
+        n_jobs (int, optional): Worker threads; None keeps the library defaults. Defaults to None.
+        row_budget (int, optional): Rows fitted by the sampled techniques. Defaults to DR_ROW_BUDGET.
+        anomaly (array-like, optional): Boolean anomaly flag per row, used for stratified sampling. Defaults to None.
+        cache_path (str, optional): Fitted reducer cache directory; None disables the cache. Defaults to None.
 
     Returns:
-        None
+        np.ndarray: Reduced data with three columns
     """
-    if technique.lower() == "pca":
-        reducer = PCA(n_components=3)
-    elif technique.lower() == "tsne":
-        reducer = TSNE(n_components=3, random_state=42)
-    else:
-        logging.error("Invalid technique. Using PCA as default.")
-        reducer = PCA(n_components=3)
+    technique = technique.lower()
+    with threadpool_limits(limits=n_jobs):
+        if technique == "incremental_pca" and not isinstance(data, pd.DataFrame):
+            return _incremental_pca_chunks(data, row_budget)
+        if not isinstance(data, pd.DataFrame):
+            data = pd.concat(data, ignore_index=True)
 
-    reduced_data = reducer.fit_transform(data)
+        if technique == "tsne":
+            return _tsne(len(data), n_jobs).fit_transform(data)
+        if technique == "tsne_sample":
+            return _sampled_tsne(data, n_jobs, row_budget, anomaly)
+        if technique not in CACHEABLE_TECHNIQUES:
+            logging.error("Invalid technique. Using PCA as default.")
+            technique = "pca"
+        return fit_transform_cached(data, technique, cache_path, row_budget, anomaly)
 
-    fig = plt.figure(figsize=(10, 8))
+@handle_exception
+@profile_stage
+def visualize_multi_dim_anomalies(data, technique="pca", n_jobs=None, row_budget=DR_ROW_BUDGET, anomaly=None, use_cache=True):
+    """
+    Utilize dimensionality reduction techniques to visualize high-dimensional data.
+
+    Args:
+        data (pd.DataFrame, iterable of pd.DataFrame or str): High-dimensional data, or an input
+            file whose numeric feature columns are loaded with load_data()
+        technique (str, optional): Dimensionality reduction technique, see reduce_dimensions. Defaults to "pca".
+        n_jobs (int, optional): Worker threads for the reducer. Defaults to None.
+        row_budget (int, optional): Rows fitted by the sampled techniques. Defaults to DR_ROW_BUDGET.
+        anomaly (array-like, optional): Boolean anomaly flag per row. Defaults to None.
+        use_cache (bool, optional): Reuse fitted reducers from reducer_cache_path, if one is set. Defaults to True.
+
+    Returns:
+        None
+    """
+    if isinstance(data, str):
+        data = load_data(data, columns=feature_columns(data))
+        data = data.drop(TIME_SERIES_COLUMNS, axis=1, errors="ignore").select_dtypes("number")
+    cache_path = reducer_cache_path if use_cache else None
+    reduced_data = reduce_dimensions(data, technique, n_jobs=n_jobs, row_budget=row_budget, anomaly=anomaly, cache_path=cache_path)
+
+    fig = _new_figure((10, 8))
     ax = fig.add_subplot(111, projection="3d")
     ax.scatter(reduced_data[:, 0], reduced_data[:, 1], reduced_data[:, 2], c="b", alpha=0.7, edgecolor="black")
     ax.set_title("Multi-Dimensional Anomaly Representation")
     ax.set_xlabel("Component 1")
     ax.set_ylabel("Component 2")
     ax.set_zlabel("Component 3")
-    plt.savefig(os.path.join(output_path, f"multi_dim_anomalies_{technique}.png"))
-    plt.show()
+    _save_figure(fig, f"multi_dim_anomalies_{technique}.png")
+
+# Parallel Figure Rendering
+def _render_in_worker(name, args, kwargs, output_dir, cache_dir, stages_to_profile):
+    global headless_render, output_path, reducer_cache_path
+    headless_render, output_path, reducer_cache_path = True, output_dir, cache_dir
+    profiled_stages.update(stages_to_profile)
+    del stage_timings[:]
+    globals()[name](*args, **kwargs)
+    return name, list(stage_timings)
+
+@handle_exception
+@profile_stage
+def render_figures(jobs, max_workers=None):
+    """
+    Render several figures at once in a process pool, headless.
+
+    Each worker draws on its own Agg Figure, encodes the PNG and writes it to
+    output_path, so the calling process only pickles the inputs and waits.
+    Wall time is roughly that of the slowest figure. The workers' stage
+    timings are added to stage_timings.
+
+    Args:
+        jobs (list): (visualize function name, args, kwargs) tuples
+        max_workers (int, optional): Worker processes. Defaults to one per job.
+
+    Returns:
+        None
+    """
+    with ProcessPoolExecutor(max_workers=max_workers or len(jobs)) as pool:
+        futures = [
+            pool.submit(_render_in_worker, name, args, kwargs, output_path, reducer_cache_path, profiled_stages)
+            for name, args, kwargs in jobs
+        ]
+        for future in futures:
+            name, timings = future.result()
+            stage_timings.extend(timings)
+            logging.info(f"Rendered {name}")
+
+def visualize_all(anomaly_scores, time_series_data, multi_dim_data, anomaly=None, headless=False):
+    """
+    Draw the three pipeline figures, interactively one by one or headless in parallel.
+
+    Args:
+        anomaly_scores (list or ScoreSummary): Anomaly scores
+        time_series_data (pd.DataFrame): Time-series data with anomaly column
+        multi_dim_data (pd.DataFrame): High-dimensional data
+        anomaly (array-like, optional): Boolean anomaly flag per multi_dim_data row. Defaults to None.
+        headless (bool, optional): Render with render_figures() and never show. Defaults to False.
+
+    Returns:
+        None
+    """
+    multi_dim_kwargs = {"technique": "tsne_sample", "anomaly": anomaly}
+    if headless:
+        render_figures([
+            ("visualize_anomaly_scores", (anomaly_scores,), {}),
+            ("visualize_time_series_anomalies", (time_series_data,), {}),
+            ("visualize_multi_dim_anomalies", (multi_dim_data,), multi_dim_kwargs),
+        ])
+        return
+
+    visualize_anomaly_scores(anomaly_scores)
+    visualize_time_series_anomalies(time_series_data)
+    visualize_multi_dim_anomalies(multi_dim_data, **multi_dim_kwargs)
 
 # API-Driven Missing Value Imputation
 @handle_exception
-def impute_missing_values(data):
+@profile_stage
+def impute_missing_values(data, sparse=False, context_columns=None):
     """
     Identify and impute missing values in datasets using API documentation.
 
+    In sparse mode only the rows with a missing value are sent, restricted to
+    the columns that have missing values plus context_columns, and the
+    returned values are written into the missing cells of data in place.
+    Payload and parsing then scale with the missing rows, not the dataset.
+
     Args:
         data (pd.DataFrame): Dataset with potential missing values
+        sparse (bool, optional): Send only the affected rows and patch data in place. Defaults to False.
+        context_columns (list, optional): Columns the API needs alongside the missing ones in sparse mode. Defaults to None.
 
     Returns:
-        pd.DataFrame: Dataset with imputed missing values
+        pd.DataFrame: Dataset with imputed missing values (data itself in sparse mode)
     """
+    if sparse:
+        missing = data.isna()
+        rows = np.flatnonzero(missing.any(axis=1).to_numpy())
+        if len(rows) == 0:
+            return data
+        columns = list(data.columns[missing.any(axis=0).to_numpy()])
+        payload = data.iloc[rows][list(dict.fromkeys(list(context_columns or []) + columns))]
+        records = payload.astype(object).where(payload.notna(), None).to_dict(orient="records")
+    else:
+        records = data.to_dict(orient="records")
+
     response = requests.post(
         API_URL + "/impute",
         headers={"Authorization": f"Bearer {API_KEY}"},
-        json={"data": data.to_dict(orient="records")},
+        json={"data": records},
     )
 
     if response.status_code == 200:
         imputed_data = pd.DataFrame(response.json())
-        return imputed_data
+        if not sparse:
+            return imputed_data
+        if len(imputed_data) != len(rows):
+            raise ValueError(f"Imputation returned {len(imputed_data)} rows for {len(rows)} sent")
+        for column in columns:
+            cells = missing[column].to_numpy()[rows]
+            data.iloc[rows[cells], data.columns.get_loc(column)] = imputed_data[column].to_numpy()[cells]
+        logging.info(f"Imputed {int(missing.to_numpy().sum())} missing cells in {len(rows)} rows")
+        return data
     else:
         logging.error("Failed to impute missing values")
         return None
 
 # Date Column Existence Verification
 @handle_exception
+@profile_stage
 def verify_date_column(data):
     """
     Verify the presence of a designated date column within incoming datasets through API interactions.
@@ -184,43 +1083,370 @@ def verify_date_column(data):
 
 # Standardized Date Format Conversion (to Datetime)
 @handle_exception
-def convert_date_format(data, date_column):
+@profile_stage
+def convert_date_format(data, date_column, source=None):
     """
     Automatically convert identified date columns to a standardized datetime format.
 
+    Numeric columns are read as epoch timestamps, with the unit taken from
+    the largest magnitude (EPOCH_UNITS), and timezone-aware columns are
+    converted to naive UTC. Text is parsed with the vectorised parser one
+    format of DATE_FORMATS at a time, each pass only over the values still
+    unparsed. "ISO8601" covers the ISO variants, with offsets converted to
+    naive UTC. What is left is read with a single date order from
+    DATE_ORDER_FORMATS: the first one that parses every value either order
+    can parse, so day-first and month-first are never mixed in one column.
+    If both orders are needed, a warning is logged and the values only the
+    other order parses become NaT. When a source is given, the formats that
+    matched are remembered per source and column (for the
+    DATE_FORMAT_CACHE_ENTRIES most recently used pairs), so later chunks of
+    the same file try those first, usually finish in a single pass, and keep
+    the date order chosen earlier. Values no format matches become NaT.
+
     Args:
         data (pd.DataFrame): Dataset with date column
         date_column (str): Name of the date column
+        source (str, optional): Input the data came from, for the format cache; None skips the cache. Defaults to None.
 
     Returns:
         pd.DataFrame: Dataset with standardized date format
     """
-    data[date_column] = pd.to_datetime(data[date_column], format=DATE_FORMAT, errors="coerce")
+    values = data[date_column]
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        parsed = values.dt.tz_convert("UTC").dt.tz_localize(None)
+    elif pd.api.types.is_datetime64_any_dtype(values):
+        parsed = values
+    elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        magnitude = values.abs().max()
+        unit = next((unit for bound, unit in EPOCH_UNITS if magnitude < bound), "ns")
+        parsed = pd.to_datetime(values, unit=unit, errors="coerce")
+    else:
+        detected = set() if source is None else _cached_date_formats(source, date_column)
+        parsed = _parse_date_strings(values, detected, date_column)
+    data[date_column] = parsed.astype("datetime64[ns]")
     return data
 
+def _cached_date_formats(source, date_column):
+    key = (source, date_column)
+    detected = date_format_cache.pop(key, set())
+    date_format_cache[key] = detected
+    while len(date_format_cache) > DATE_FORMAT_CACHE_ENTRIES:
+        date_format_cache.popitem(last=False)
+    return detected
+
+def _parse_date_strings(values, detected, date_column):
+    parsed = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[ns]")
+    positions = np.flatnonzero(values.notna().to_numpy())
+    remaining = values.iloc[positions].astype(str)
+    formats = sorted(DATE_FORMATS, key=lambda fmt: fmt not in detected)
+    attempt, matched = _parse_with_formats(remaining, formats)
+    detected.update(matched)
+    parsed[positions] = attempt
+    unparsed = np.isnat(attempt)
+    if unparsed.any():
+        parsed[positions[unparsed]] = _parse_date_order(remaining.iloc[np.flatnonzero(unparsed)], detected, date_column)
+    return pd.Series(parsed, index=values.index)
+
+def _parse_date_order(values, detected, date_column):
+    cached = [order for order in DATE_ORDER_FORMATS if not detected.isdisjoint(order)]
+    orders = cached + [order for order in DATE_ORDER_FORMATS if order not in cached]
+    attempts = []
+    for order in orders:
+        attempts.append(_parse_with_formats(values, order))
+        if not np.isnat(attempts[-1][0]).any():
+            break
+    hits = [~np.isnat(attempt) for attempt, _ in attempts]
+    parseable = np.logical_or.reduce(hits)
+    if cached:
+        choice = 0
+    else:
+        covering = [index for index, hit in enumerate(hits) if hit[parseable].all()]
+        choice = covering[0] if covering else int(np.argmax([hit.sum() for hit in hits]))
+    dropped = int((parseable & ~hits[choice]).sum())
+    if dropped:
+        logging.warning(
+            f"Column {date_column} mixes day-first and month-first dates; "
+            f"reading it as {orders[choice][-1]} and leaving {dropped} values unparsed"
+        )
+    attempt, matched = attempts[choice]
+    detected.update(matched)
+    return attempt
+
+def _parse_with_formats(values, formats):
+    parsed = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[ns]")
+    positions = np.arange(len(values))
+    matched = []
+    for fmt in formats:
+        if len(positions) == 0:
+            break
+        remaining = values.iloc[positions]
+        if fmt == "ISO8601":
+            attempt = pd.to_datetime(remaining, format=fmt, errors="coerce", utc=True).dt.tz_localize(None)
+        else:
+            attempt = pd.to_datetime(remaining, format=fmt, errors="coerce")
+        hits = attempt.notna().to_numpy()
+        if hits.any():
+            matched.append(fmt)
+            parsed[positions[hits]] = attempt.to_numpy()[hits]
+            positions = positions[~hits]
+    return parsed, matched
+
+# Chunked Data Loading
+class ReservoirSample:
+    """
+    Fixed-size uniform random sample of DataFrame rows, updated chunk by chunk.
+
+    Every row gets a random priority and the rows with the smallest priorities
+    are kept, which is a uniform sample without replacement. Sampled rows stay
+    in file order. Memory is bounded by size plus one chunk.
+
+    Args:
+        size (int): Maximum number of rows kept
+        seed (int, optional): Random seed. Defaults to 42.
+    """
+
+    def __init__(self, size, seed=42):
+        self.size = size
+        self.rows_seen = 0
+        self._rng = np.random.default_rng(seed)
+        self._sample = None
+        self._priorities = np.empty(0)
+
+    def update(self, frame):
+        priorities = self._rng.random(len(frame))
+        self.rows_seen += len(frame)
+        if self._sample is not None:
+            frame = pd.concat([self._sample, frame], ignore_index=True)
+            priorities = np.concatenate([self._priorities, priorities])
+        if len(frame) > self.size:
+            keep = np.sort(np.argpartition(priorities, self.size)[: self.size])
+            frame = frame.iloc[keep]
+            priorities = priorities[keep]
+        self._sample = frame.reset_index(drop=True)
+        self._priorities = priorities
+
+    def result(self):
+        return self._sample
+
+
+def read_csv_in_chunks(path, chunk_size=CSV_CHUNK_SIZE, usecols=None, dtype=None):
+    """
+    Read a CSV file lazily in chunks with explicit dtypes and column pruning.
+
+    Args:
+        path (str): CSV file to read
+        chunk_size (int, optional): Rows per chunk. Defaults to CSV_CHUNK_SIZE.
+        usecols (list, optional): Columns to parse; all others are skipped. Defaults to None (all columns).
+        dtype (dict, optional): Column dtypes. Defaults to the CSV_DTYPES entries for the selected columns.
+
+    Returns:
+        pandas.io.parsers.TextFileReader: Iterator of DataFrame chunks
+    """
+    if dtype is None:
+        header = pd.read_csv(path, nrows=0).columns
+        selected = header if usecols is None else [column for column in header if column in usecols]
+        dtype = {column: CSV_DTYPES[column] for column in selected if column in CSV_DTYPES}
+    return pd.read_csv(path, chunksize=chunk_size, usecols=usecols, dtype=dtype)
+
+# Columnar Input
+def converted_cache_path(path):
+    """
+    Path of the Feather copy that load_data() keeps next to a CSV file.
+
+    Args:
+        path (str): CSV file
+
+    Returns:
+        str: Same path with a .feather suffix
+    """
+    return os.path.splitext(path)[0] + ".feather"
+
+def _columnar_source(path):
+    # CSV inputs are served from their converted copy while it is newer than the CSV
+    if path.lower().endswith(COLUMNAR_SUFFIXES):
+        return path
+    cache = converted_cache_path(path)
+    if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(path):
+        return cache
+    return None
+
+def _read_columnar(path, columns=None):
+    # Both readers map the file instead of reading it; uncompressed Feather
+    # columns are then used in place without a copy.
+    if path.lower().endswith(".parquet"):
+        return pq.read_table(path, columns=columns, memory_map=True)
+    return feather.read_table(path, columns=columns, memory_map=True)
+
+def _arrow_schema(source):
+    if source.lower().endswith(".parquet"):
+        return pq.read_schema(source, memory_map=True)
+    with pa.memory_map(source) as stream:
+        return pa.ipc.open_file(stream).schema
+
+def input_columns(path):
+    """
+    Column names of an input file, read from the header or the Arrow schema only.
+
+    Args:
+        path (str): CSV, Parquet or Feather file
+
+    Returns:
+        list: Column names
+    """
+    source = _columnar_source(path)
+    if source is None:
+        return list(pd.read_csv(path, nrows=0).columns)
+    return _arrow_schema(source).names
+
+def feature_columns(path):
+    """
+    Numeric columns of a columnar input outside TIME_SERIES_COLUMNS, from its schema.
+
+    Args:
+        path (str): CSV, Parquet or Feather file
+
+    Returns:
+        list: Feature column names, or None for a CSV without a converted copy
+    """
+    source = _columnar_source(path)
+    if source is None:
+        return None
+    return [
+        field.name for field in _arrow_schema(source)
+        if field.name not in TIME_SERIES_COLUMNS and (pa.types.is_integer(field.type) or pa.types.is_floating(field.type))
+    ]
+
+@handle_exception
+@profile_stage
+def load_data(path, columns=None, cache=CACHE_CONVERTED_INPUT):
+    """
+    Load an input file, reading columnar files through memory-mapped Arrow.
+
+    Parquet and Feather files are read with only the requested columns
+    materialised. A CSV file is read from its converted Feather copy when
+    that copy is newer; otherwise it is parsed, and with cache=True the
+    result is written next to it as uncompressed Feather so later runs skip
+    CSV parsing.
+
+    Args:
+        path (str): CSV, Parquet or Feather file
+        columns (list, optional): Columns to load. Defaults to None (all columns).
+        cache (bool, optional): Write the converted copy of a CSV input. Defaults to CACHE_CONVERTED_INPUT.
+
+    Returns:
+        pd.DataFrame: Loaded data
+    """
+    source = _columnar_source(path)
+    if source is not None:
+        return _read_columnar(source, columns).to_pandas()
+
+    if not cache:
+        return pd.read_csv(path, usecols=columns)
+    data = pd.read_csv(path)
+    target = converted_cache_path(path)
+    feather.write_feather(data, target + ".tmp", compression="uncompressed")
+    os.replace(target + ".tmp", target)
+    logging.info(f"Wrote converted input {target}")
+    return data if columns is None else data[columns]
+
+def read_in_chunks(path, chunk_size=CSV_CHUNK_SIZE, columns=None):
+    """
+    Read a CSV, Parquet or Feather input lazily in DataFrame chunks.
+
+    CSV files without a current converted copy go through read_csv_in_chunks().
+
+    Args:
+        path (str): Input file
+        chunk_size (int, optional): Rows per chunk. Defaults to CSV_CHUNK_SIZE.
+        columns (list, optional): Columns to load. Defaults to None (all columns).
+
+    Returns:
+        iterator: DataFrame chunks
+    """
+    source = _columnar_source(path)
+    if source is None:
+        return read_csv_in_chunks(path, chunk_size, usecols=columns)
+    if source.lower().endswith(".parquet"):
+        batches = pq.ParquetFile(source, memory_map=True).iter_batches(batch_size=chunk_size, columns=columns)
+    else:
+        batches = _read_columnar(source, columns).to_batches(max_chunksize=chunk_size)
+    return (batch.to_pandas() for batch in batches)
+
+
+@handle_exception
+@profile_stage
+def build_visualisation_inputs(chunks, max_points=MAX_PLOT_POINTS, on_chunk=None):
+    """
+    Build the inputs of the three visualisations incrementally from DataFrame chunks.
+
+    Anomaly scores go into a ScoreSummary, the time series into a
+    TimeSeriesDownsampler, and the multi-dimensional stage keeps only its own
+    columns in two ReservoirSamples: max_points normal rows and a
+    DR_ANOMALY_FRACTION share of max_points anomalous rows, so rare anomalies
+    survive the sampling and can be stratified into the t-SNE sample.
+    Peak memory is bounded by the chunk size and max_points rather than by the
+    file size.
+
+    Args:
+        chunks (iterable): DataFrame chunks, e.g. from read_csv_in_chunks()
+        max_points (int, optional): Rows kept per stage. Defaults to MAX_PLOT_POINTS.
+        on_chunk (callable, optional): Called with every chunk, e.g. for per-chunk API stages. Defaults to None.
+
+    Returns:
+        tuple: (ScoreSummary of anomaly scores, time-series DataFrame, multi-dimensional DataFrame,
+            boolean anomaly flag per multi-dimensional row)
+    """
+    score_stage = ScoreSummary()
+    time_series_stage = TimeSeriesDownsampler(max_points)
+    normal_stage = ReservoirSample(max_points)
+    anomalous_stage = ReservoirSample(int(max_points * DR_ANOMALY_FRACTION))
+    for chunk in chunks:
+        score_stage.update(chunk["anomaly_score"].to_numpy())
+        time_series_stage.update(chunk[TIME_SERIES_COLUMNS])
+        features = chunk.drop(TIME_SERIES_COLUMNS, axis=1).select_dtypes("number")
+        flags = chunk["anomaly"].to_numpy(dtype=bool)
+        normal_stage.update(features[~flags])
+        anomalous_stage.update(features[flags])
+        if on_chunk is not None:
+            on_chunk(chunk)
+    logging.info(f"Streamed {time_series_stage.rows_seen} rows")
+    normal, anomalous = normal_stage.result(), anomalous_stage.result()
+    if normal is None:
+        return score_stage, time_series_stage.result(), None, None
+    multi_dim = pd.concat([normal, anomalous], ignore_index=True)
+    anomaly = np.repeat([False, True], [len(normal), len(anomalous)])
+    return score_stage, time_series_stage.result(), multi_dim, anomaly
+
 # Main Function
 @handle_exception
-def main():
+def main(streaming=False, chunk_size=CSV_CHUNK_SIZE, headless=False, score_method=None, input_file=None, cache_input=CACHE_CONVERTED_INPUT):
+    del stage_timings[:]  # the timing report covers this run only
+    input_file = input_file or os.path.join(data_path, "data.csv")
+    if streaming:
+        return main_streaming(chunk_size, headless, score_method, input_file)
+
     # Load data
-    data = pd.read_csv(os.path.join(data_path, "data.csv"))
+    data = load_data(input_file, cache=cache_input)
+
+    # Anomaly Scoring
+    if score_method is not None or not {"anomaly_score", "anomaly"}.issubset(data.columns):
+        data = score_anomalies(data, score_method or SCORE_METHOD)
 
     # Anomaly Scoring Visualizations
     global anomaly_scores
     anomaly_scores = data["anomaly_score"].tolist()
-    visualize_anomaly_scores(anomaly_scores)
 
     # Time-Series Anomaly Visualization
     global time_series_data
     time_series_data = data[["time", "value", "anomaly"]]
-    visualize_time_series_anomalies(time_series_data)
 
     # Multi-Dimensional Anomaly Representation
     global multi_dim_data
-    multi_dim_data = data.drop(["time", "value", "anomaly"], axis=1)
-    visualize_multi_dim_anomalies(multi_dim_data, technique="tsne")
+    multi_dim_data = data.drop(["time", "value", "anomaly"], axis=1).select_dtypes("number")
+    visualize_all(anomaly_scores, time_series_data, multi_dim_data, anomaly=data["anomaly"], headless=headless)
 
     # API-Driven Missing Value Imputation
-    imputed_data = impute_missing_values(data)
+    imputed_data = impute_missing_values(data, sparse=True)
     if imputed_data is not None:
         logging.info("Missing values imputed successfully")
 
@@ -230,11 +1456,74 @@ def main():
         logging.info("Date column exists in the dataset")
 
     # Standardized Date Format Conversion (to Datetime)
-    converted_data = convert_date_format(data, "date_column")
+    converted_data = convert_date_format(data, DATE_COLUMN, source=input_file)
+    logging.info("Date format converted successfully")
+
+@handle_exception
+def main_streaming(chunk_size=CSV_CHUNK_SIZE, headless=False, score_method=None, input_file=None):
+    """
+    Run the pipeline over the input file in chunks so memory does not grow with the file size.
+
+    The visualisations are drawn from bounded per-stage samples; the API
+    stages run on every chunk.
+
+    Args:
+        chunk_size (int, optional): Rows per chunk. Defaults to CSV_CHUNK_SIZE.
+        headless (bool, optional): Render the figures in parallel without showing them. Defaults to False.
+        score_method (str, optional): Recompute the anomaly columns with this method; they are also
+            computed, with SCORE_METHOD, when the input lacks them. Defaults to None.
+        input_file (str, optional): CSV, Parquet or Feather input. Defaults to data.csv in data_path.
+
+    Returns:
+        None
+    """
+    global anomaly_scores, time_series_data, multi_dim_data
+    chunk_state = {"date_column_exists": False, "chunks": 0}
+
+    def process_chunk(chunk):
+        chunk_state["chunks"] += 1
+        if impute_missing_values(chunk, sparse=True) is not None:
+            logging.info(f"Missing values imputed for chunk {chunk_state['chunks']}")
+        if chunk_state["chunks"] == 1:
+            chunk_state["date_column_exists"] = verify_date_column(chunk)
+            if chunk_state["date_column_exists"]:
+                logging.info("Date column exists in the dataset")
+        convert_date_format(chunk, DATE_COLUMN, source=path)
+
+    path = input_file or os.path.join(data_path, "data.csv")
+    chunks = read_in_chunks(path, chunk_size)
+    if score_method is not None or not {"anomaly_score", "anomaly"}.issubset(input_columns(path)):
+        scorer = AnomalyScorer(score_method or SCORE_METHOD)
+        chunks = (scorer.update(chunk) for chunk in chunks)
+    anomaly_scores, time_series_data, multi_dim_data, anomaly = build_visualisation_inputs(chunks, on_chunk=process_chunk)
     logging.info("Date format converted successfully")
 
+    visualize_all(anomaly_scores, time_series_data, multi_dim_data, anomaly=anomaly, headless=headless)
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Anomaly visualisation pipeline")
+    parser.add_argument("--input", help="CSV, Parquet or Feather input (default: data.csv in the data directory)")
+    parser.add_argument("--cache-input", action="store_true", help="write a Feather copy next to a CSV input on first read")
+    parser.add_argument("--reducer-cache", metavar="DIR", help="keep fitted dimensionality reducers in DIR across runs")
+    parser.add_argument("--streaming", action="store_true", help="process the input in chunks")
+    parser.add_argument("--chunk-size", type=int, default=CSV_CHUNK_SIZE, help="rows per chunk in streaming mode")
+    parser.add_argument("--headless", action="store_true", help="render figures in parallel without showing them")
+    parser.add_argument("--score", choices=sorted(ANOMALY_THRESHOLDS), help="recompute anomaly_score and anomaly with this method")
+    parser.add_argument("--timing-report", action="store_true", help="write timing_report.json with per-stage timings")
+    parser.add_argument("--profile-stage", action="append", default=[], help="dump cProfile stats for this stage (repeatable)")
+    args = parser.parse_args()
+    profiled_stages.update(args.profile_stage)
+    reducer_cache_path = args.reducer_cache
+    main(
+        streaming=args.streaming,
+        chunk_size=args.chunk_size,
+        headless=args.headless,
+        score_method=args.score,
+        input_file=args.input,
+        cache_input=args.cache_input,
+    )
+    if args.timing_report:
+        write_timing_report()
 
 
 #*End of AI Generated Content*
\ No newline at end of file
@@ -6,10 +6,13 @@ python
 # -*- coding: utf-8 -*-
 
 import os
+import json
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 import pandas as pd
 import numpy as np
+from sklearn.decomposition import IncrementalPCA
 from your_module import (  # Replace 'your_module' with the actual module name
     visualize_anomaly_scores,
     visualize_time_series_anomalies,
@@ -18,6 +21,28 @@ from your_module import (  # Replace 'your_module' with the actual module name
     verify_date_column,
     convert_date_format,
     handle_exception,
+    ReservoirSample,
+    ScoreSummary,
+    downsample_time_series,
+    reduce_dimensions,
+    fit_transform_cached,
+    _fit_reducer,
+    render_figures,
+    rolling_scores,
+    score_anomalies,
+    AnomalyScorer,
+    load_data,
+    read_in_chunks,
+    feature_columns,
+    converted_cache_path,
+    profile_stage,
+    write_timing_report,
+    stage_timings,
+    date_format_cache,
+    stratified_sample_positions,
+    read_csv_in_chunks,
+    build_visualisation_inputs,
+    main,
     API_URL,
     API_KEY,
     DATE_FORMAT,
@@ -111,6 +136,31 @@ class TestAnomalyDetectionModule(unittest.TestCase):
         self.assertIsNotNone(imputed_data)
         self.assertIsInstance(imputed_data, pd.DataFrame)
 
+    @patch('requests.post')
+    def test_impute_missing_values_sparse(self, mock_post):
+        """
+        Test sparse missing value imputation.
+        
+        Verify that only rows and columns with missing values are sent and the results are patched into the frame in place.
+        """
+        data = pd.DataFrame({"key": range(1000), "value": np.arange(1000, dtype=float), "label": ["x"] * 1000})
+        data.loc[[10, 500], "value"] = np.nan
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [{"key": 10, "value": -1.0}, {"key": 500, "value": -2.0}]
+        mock_post.return_value = mock_response
+
+        imputed_data = impute_missing_values(data, sparse=True, context_columns=["key"])
+        sent = mock_post.call_args.kwargs["json"]["data"]
+        self.assertEqual(sent, [{"key": 10, "value": None}, {"key": 500, "value": None}])
+        self.assertIs(imputed_data, data)
+        self.assertEqual(data.loc[[9, 10, 500], "value"].tolist(), [9.0, -1.0, -2.0])
+        self.assertFalse(data["value"].isna().any())
+
+        mock_post.reset_mock()
+        self.assertIs(impute_missing_values(data, sparse=True), data)
+        mock_post.assert_not_called()
+
     @patch('requests.post')
     def test_impute_missing_values_failure(self, mock_post):
         """
@@ -168,6 +218,489 @@ class TestAnomalyDetectionModule(unittest.TestCase):
         except Exception as e:
             self.fail(f"convert_date_format() raised an exception: {str(e)}")
 
+    def test_convert_date_format_mixed_formats(self):
+        """
+        Test multi-format and epoch date parsing.
+
+        Verify that every listed format and epoch seconds are parsed, unparseable values become NaT, and detected formats are cached.
+        """
+        data = pd.DataFrame({"date_column": ["2022-01-01 12:00:00", "2022-01-02T12:00:00", "03/01/2022", "not a date", None]})
+        converted = convert_date_format(data, "date_column", source="mixed.csv")["date_column"]
+        self.assertEqual(converted.dtype, "datetime64[ns]")
+        self.assertEqual(converted.iloc[:3].tolist(), [
+            pd.Timestamp("2022-01-01 12:00:00"), pd.Timestamp("2022-01-02 12:00:00"), pd.Timestamp("2022-01-03"),
+        ])
+        self.assertTrue(converted.iloc[3:].isna().all())
+        self.assertEqual(date_format_cache[("mixed.csv", "date_column")], {"%Y-%m-%d %H:%M:%S", "ISO8601", "%d/%m/%Y"})
+
+        epoch = convert_date_format(pd.DataFrame({"date_column": [1_641_038_400, 1_641_124_800]}), "date_column")
+        self.assertEqual(epoch["date_column"].iloc[0], pd.Timestamp("2022-01-01 12:00:00"))
+
+    def test_convert_date_format_keeps_one_date_order(self):
+        """
+        Test day-first and month-first date parsing.
+
+        Verify that one date order is used for the whole column, that a later chunk keeps the order of the first,
+        and that values only the other order can read are left unparsed with a warning.
+        """
+        data = pd.DataFrame({"date_column": ["12/31/2024", "01/02/2024", "07/04/2024"]})
+        converted = convert_date_format(data, "date_column", source="us.csv")["date_column"]
+        self.assertEqual(converted.tolist(), [pd.Timestamp("2024-12-31"), pd.Timestamp("2024-01-02"), pd.Timestamp("2024-07-04")])
+        self.assertEqual(date_format_cache[("us.csv", "date_column")], {"%m/%d/%Y"})
+
+        chunk = convert_date_format(pd.DataFrame({"date_column": ["03/04/2024"]}), "date_column", source="us.csv")
+        self.assertEqual(chunk["date_column"].iloc[0], pd.Timestamp("2024-03-04"))
+
+        with self.assertLogs(level="WARNING") as logs:
+            mixed = convert_date_format(pd.DataFrame({"date_column": ["31/12/2024", "25/12/2024", "12/31/2024"]}), "date_column", source="eu.csv")
+        self.assertEqual(mixed["date_column"].iloc[:2].tolist(), [pd.Timestamp("2024-12-31"), pd.Timestamp("2024-12-25")])
+        self.assertTrue(pd.isna(mixed["date_column"].iloc[2]))
+        self.assertIn("mixes day-first and month-first", logs.output[0])
+
+    def test_convert_date_format_cache_needs_source(self):
+        """
+        Test the detected-format cache.
+
+        Verify that calls without a source do not share a date order, and that the cache keeps a bounded number of sources.
+        """
+        day_first = convert_date_format(pd.DataFrame({"date_column": ["31/12/2024", "25/12/2024"]}), "date_column")
+        month_first = convert_date_format(pd.DataFrame({"date_column": ["12/31/2024", "12/25/2024"]}), "date_column")
+        self.assertEqual(day_first["date_column"].tolist(), [pd.Timestamp("2024-12-31"), pd.Timestamp("2024-12-25")])
+        self.assertEqual(month_first["date_column"].tolist(), [pd.Timestamp("2024-12-31"), pd.Timestamp("2024-12-25")])
+        self.assertNotIn((None, "date_column"), date_format_cache)
+
+        with patch("your_module.DATE_FORMAT_CACHE_ENTRIES", 2):
+            for source in ("a.csv", "b.csv", "c.csv"):
+                convert_date_format(pd.DataFrame({"date_column": ["2024-01-01 00:00:00"]}), "date_column", source=source)
+            self.assertNotIn(("a.csv", "date_column"), date_format_cache)
+            self.assertIn(("c.csv", "date_column"), date_format_cache)
+
+    def test_convert_date_format_timezone_aware(self):
+        """
+        Test conversion of a timezone-aware datetime column.
+
+        Verify that the column is converted to naive UTC instead of raising.
+        """
+        data = pd.DataFrame({"date_column": pd.date_range("2024-01-01", periods=2, freq="h", tz="Europe/Berlin")})
+        converted = convert_date_format(data, "date_column")["date_column"]
+        self.assertEqual(converted.dtype, "datetime64[ns]")
+        self.assertEqual(converted.tolist(), [pd.Timestamp("2023-12-31 23:00:00"), pd.Timestamp("2024-01-01 00:00:00")])
+
+    def test_reservoir_sample_is_bounded(self):
+        """
+        Test the chunk-by-chunk reservoir sample.
+
+        Verify that the sample never exceeds its size and keeps rows in input order.
+        """
+        sample = ReservoirSample(10)
+        for start in range(0, 1000, 100):
+            sample.update(pd.DataFrame({"x": np.arange(start, start + 100)}))
+        result = sample.result()
+        self.assertEqual(len(result), 10)
+        self.assertEqual(sample.rows_seen, 1000)
+        self.assertTrue(result["x"].is_monotonic_increasing)
+
+    def test_build_visualisation_inputs_from_chunks(self):
+        """
+        Test streaming CSV ingestion.
+
+        Verify that chunks are read with explicit dtypes and that each stage receives only its own columns.
+        """
+        frame = pd.DataFrame({
+            "time": np.arange(50),
+            "value": np.random.rand(50),
+            "anomaly": [False] * 49 + [True],
+            "anomaly_score": np.random.rand(50),
+            "feature_a": np.random.rand(50),
+            "label": ["x"] * 50,
+        })
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "data.csv")
+            frame.to_csv(path, index=False)
+            chunks = read_csv_in_chunks(path, chunk_size=7)
+            scores, time_series, multi_dim, anomaly = build_visualisation_inputs(chunks, max_points=20)
+        self.assertEqual(scores.count, 50)
+        self.assertEqual(list(time_series.columns), ["time", "value", "anomaly"])
+        self.assertEqual(time_series["anomaly"].dtype, bool)
+        self.assertEqual(list(multi_dim.columns), ["anomaly_score", "feature_a"])
+        self.assertEqual(len(anomaly), len(multi_dim))
+        self.assertEqual(int(anomaly.sum()), 1)
+        self.assertAlmostEqual(multi_dim["feature_a"][anomaly].iloc[0], frame["feature_a"].iloc[-1])
+
+    def test_score_summary_matches_exact_statistics(self):
+        """
+        Test the streaming score summary.
+
+        Verify that chunked histogram counts equal np.histogram and sketch quartiles stay close to the exact ones.
+        """
+        scores = np.random.default_rng(0).normal(size=200_000)
+        summary = ScoreSummary(value_range=(-5, 5), sketch_size=500, seed=0)
+        for chunk in np.array_split(scores, 20):
+            summary.update(chunk)
+        counts, edges = summary.histogram()
+        expected, _ = np.histogram(scores, bins=edges)
+        self.assertEqual(counts.tolist(), expected.tolist())
+        estimates = summary.quantiles([0.25, 0.5, 0.75])
+        np.testing.assert_allclose(estimates, np.percentile(scores, [25, 50, 75]), atol=0.05)
+        self.assertLess(sum(len(level) for level in summary._levels), 20 * 500)
+
+    def test_score_summary_merge(self):
+        """
+        Test merging summaries from separate workers.
+
+        Verify that a merged summary has the same histogram as one built from all scores, and that grids must match.
+        """
+        scores = np.random.default_rng(1).random(10_000) * 3
+        left = ScoreSummary(value_range=(0, 1)).update(scores[:5000])
+        right = ScoreSummary(value_range=(0, 1)).update(scores[5000:])
+        whole = ScoreSummary(value_range=(0, 1)).update(scores)
+        left.merge(right)
+        self.assertEqual(left.count, 10_000)
+        self.assertEqual(left.histogram()[0].tolist(), whole.histogram()[0].tolist())
+        self.assertEqual(left.histogram()[0].sum(), 10_000)
+        with self.assertRaises(ValueError):
+            left.merge(ScoreSummary(value_range=(0, 2)).update([0.5]))
+
+    def test_score_summary_merge_without_value_range(self):
+        """
+        Test merging default summaries whose first chunks had different ranges.
+
+        Verify that the grids are reconciled instead of rejected and the merged histogram counts every score.
+        """
+        rng = np.random.default_rng(3)
+        narrow, wide = rng.random(5000), rng.normal(size=5000) * 10
+        merged = ScoreSummary().update(narrow).merge(ScoreSummary().update(wide))
+        self.assertEqual(merged.count, 10_000)
+        counts, edges = merged.histogram()
+        self.assertEqual(len(counts), 50)
+        self.assertEqual(counts.sum(), 10_000)
+        expected, _ = np.histogram(np.concatenate([narrow, wide]), bins=edges)
+        self.assertLess(np.abs(counts - expected).max(), 0.05 * expected.max())
+        reverse = ScoreSummary().update(wide).merge(ScoreSummary().update(narrow))
+        self.assertEqual(reverse.histogram()[0].tolist(), counts.tolist())
+
+    def test_score_summary_widened_range_keeps_bin_count(self):
+        """
+        Test a summary whose later chunks fall outside the range of the first.
+
+        Verify that the histogram still has the configured number of bars over the widened range and counts every score.
+        """
+        rng = np.random.default_rng(2)
+        scores = np.concatenate([rng.random(1000), rng.random(20_000) * 3 - 0.5])
+        summary = ScoreSummary(bins=50)
+        for chunk in np.array_split(scores, 21):
+            summary.update(chunk)
+        counts, edges = summary.histogram()
+        self.assertEqual(len(counts), 50)
+        self.assertLessEqual(edges[0], scores.min())
+        self.assertGreaterEqual(edges[-1], scores.max())
+        self.assertEqual(counts.sum(), len(scores))
+        expected, _ = np.histogram(scores, bins=edges)
+        self.assertLess(np.abs(counts - expected).max(), 0.05 * expected.max())
+
+    def test_visualize_anomaly_scores_from_summary(self):
+        """
+        Test anomaly score visualization from a streaming summary.
+
+        Verify that the plot renders from a ScoreSummary without the raw scores.
+        """
+        summary = ScoreSummary().update(np.random.rand(1000))
+        try:
+            visualize_anomaly_scores(summary)
+            self.assertTrue(os.path.exists("output/anomaly_scores.png"))
+        finally:
+            if os.path.exists("output/anomaly_scores.png"):
+                os.remove("output/anomaly_scores.png")
+
+    def test_downsample_time_series_preserves_shape_and_anomalies(self):
+        """
+        Test time-series downsampling.
+
+        Verify that the point budget is respected, extremes and every anomaly row are kept, and order is preserved.
+        """
+        rows = 1_000_000
+        values = np.sin(np.linspace(0, 50, rows))
+        values[123_457] = 10.0
+        anomaly = np.zeros(rows, dtype=bool)
+        anomaly[[5, 500_001, 999_998]] = True
+        data = pd.DataFrame({"time": np.arange(rows), "value": values, "anomaly": anomaly})
+        sampled = downsample_time_series(data, max_points=2000)
+        self.assertLessEqual(len(sampled), 2000 + 3)
+        self.assertEqual(sampled["value"].max(), 10.0)
+        self.assertEqual(sampled["value"].min(), values.min())
+        self.assertEqual(int(sampled["anomaly"].sum()), 3)
+        self.assertTrue(sampled["time"].is_monotonic_increasing)
+        self.assertIs(downsample_time_series(self.time_series_data), self.time_series_data)
+
+    def test_stratified_sample_oversamples_anomalies(self):
+        """
+        Test the stratified sample used by the scalable reducers.
+
+        Verify that the budget is respected and anomalies fill their reserved share.
+        """
+        anomaly = np.zeros(100_000, dtype=bool)
+        anomaly[::1000] = True
+        positions = stratified_sample_positions(len(anomaly), anomaly, budget=200)
+        self.assertEqual(len(positions), 200)
+        self.assertEqual(int(anomaly[positions].sum()), 100)
+        self.assertEqual(len(stratified_sample_positions(50, anomaly[:50], budget=200)), 50)
+
+    def test_reduce_dimensions_scalable_techniques(self):
+        """
+        Test the scalable dimensionality reduction backends.
+
+        Verify that every technique returns three components per row, and chunked incremental PCA returns a bounded sample.
+        """
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame(rng.random((3000, 6)), columns=list("abcdef"))
+        anomaly = np.zeros(len(data), dtype=bool)
+        anomaly[:30] = True
+        for technique in ["randomized_pca", "incremental_pca", "tsne_sample"]:
+            reduced = reduce_dimensions(data, technique, n_jobs=1, row_budget=300, anomaly=anomaly)
+            self.assertEqual(reduced.shape, (3000, 3))
+            self.assertTrue(np.isfinite(reduced).all())
+
+        chunks = (data.iloc[start:start + 701] for start in range(0, len(data), 701))
+        reduced = reduce_dimensions(chunks, "incremental_pca", row_budget=500)
+        self.assertEqual(reduced.shape, (500, 3))
+
+    def test_incremental_pca_chunks_keep_small_chunks(self):
+        """
+        Test chunked incremental PCA with chunks smaller than the number of components.
+
+        Verify that a small final chunk is fitted with the last batch, and that an input with fewer rows than components still reduces.
+        """
+        data = pd.DataFrame(np.random.default_rng(0).random((7, 4)), columns=list("abcd"))
+        with patch.object(IncrementalPCA, "partial_fit", autospec=True, side_effect=IncrementalPCA.partial_fit) as partial_fit:
+            reduced = reduce_dimensions([data.iloc[:5], data.iloc[5:]], "incremental_pca")
+        self.assertEqual(reduced.shape, (7, 3))
+        self.assertEqual(sum(len(call.args[1]) for call in partial_fit.call_args_list), 7)
+
+        reduced = reduce_dimensions([data.iloc[:1], data.iloc[1:2]], "incremental_pca")
+        self.assertEqual(reduced.shape, (2, 3))
+
+    def test_fit_transform_cached_reuses_reducers(self):
+        """
+        Test the on-disk reducer cache.
+
+        Verify that unchanged data only transforms, appended rows use partial_fit, and changed data refits.
+        """
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame(rng.random((500, 5)), columns=list("abcde"))
+        with tempfile.TemporaryDirectory() as directory, patch("your_module._fit_reducer", wraps=_fit_reducer) as fit:
+            first = fit_transform_cached(data, "incremental_pca", directory)
+            second = fit_transform_cached(data, "incremental_pca", directory)
+            self.assertEqual(fit.call_count, 1)
+            np.testing.assert_allclose(first, second)
+
+            appended = pd.concat([data, pd.DataFrame(rng.random((100, 5)), columns=list("abcde"))], ignore_index=True)
+            self.assertEqual(fit_transform_cached(appended, "incremental_pca", directory).shape, (600, 3))
+            self.assertEqual(fit.call_count, 1)
+
+            changed = appended.copy()
+            changed.iloc[0, 0] = 2.0
+            fit_transform_cached(changed, "incremental_pca", directory)
+            fit_transform_cached(changed, "pca", directory)
+            self.assertEqual(fit.call_count, 3)
+            self.assertEqual(len(os.listdir(directory)), 2)
+
+    def test_visualize_multi_dim_anomalies_reducer_cache_is_opt_in(self):
+        """
+        Test the reducer cache of the multi-dimensional visualization.
+
+        Verify that fitted reducers are only written when reducer_cache_path is set, and then only there.
+        """
+        try:
+            with patch("your_module._reducer_cache_file") as cache_file:
+                visualize_multi_dim_anomalies(self.multi_dim_data, technique="pca")
+                cache_file.assert_not_called()
+            with tempfile.TemporaryDirectory() as directory, patch("your_module.reducer_cache_path", directory):
+                visualize_multi_dim_anomalies(self.multi_dim_data, technique="pca")
+                self.assertEqual(len(os.listdir(directory)), 1)
+        finally:
+            if os.path.exists("output/multi_dim_anomalies_pca.png"):
+                os.remove("output/multi_dim_anomalies_pca.png")
+
+    def test_render_figures_headless_in_parallel(self):
+        """
+        Test headless parallel figure rendering.
+
+        Verify that every figure is written by the worker processes and that pyplot is never shown.
+        """
+        jobs = [
+            ("visualize_anomaly_scores", (self.anomaly_scores,), {}),
+            ("visualize_time_series_anomalies", (self.time_series_data,), {}),
+            ("visualize_multi_dim_anomalies", (self.multi_dim_data,), {"technique": "pca", "use_cache": False}),
+        ]
+        with tempfile.TemporaryDirectory() as directory, patch("your_module.output_path", directory), \
+                patch("matplotlib.pyplot.show") as show:
+            render_figures(jobs)
+            self.assertEqual(
+                sorted(os.listdir(directory)),
+                ["anomaly_scores.png", "multi_dim_anomalies_pca.png", "time_series_anomalies.png"],
+            )
+        show.assert_not_called()
+
+        with tempfile.TemporaryDirectory() as directory, patch("your_module.output_path", directory), \
+                patch("your_module.headless_render", True), patch("matplotlib.pyplot.show") as show:
+            visualize_time_series_anomalies(self.time_series_data)
+            self.assertTrue(os.path.exists(os.path.join(directory, "time_series_anomalies.png")))
+        show.assert_not_called()
+
+    def test_rolling_scores_match_pandas(self):
+        """
+        Test the vectorised rolling z-score.
+
+        Verify that it matches a pandas rolling computation and that constant windows score zero.
+        """
+        values = np.random.default_rng(0).normal(size=5000)
+        rolling = pd.Series(values).rolling(50, min_periods=1)
+        expected = ((pd.Series(values) - rolling.mean()).abs() / rolling.std(ddof=0)).to_numpy()
+        np.testing.assert_allclose(rolling_scores(values, 50)[1:], expected[1:])
+        self.assertEqual(rolling_scores(np.ones(10), 5, "mad").tolist(), [0.0] * 10)
+
+    def test_score_anomalies_is_chunking_invariant(self):
+        """
+        Test chunked and streaming anomaly scoring.
+
+        Verify that chunk size, worker processes and AnomalyScorer give the same scores and flag the injected spikes.
+        """
+        rng = np.random.default_rng(0)
+        values = rng.normal(size=20_000)
+        values[[5000, 12_000]] = 15.0
+        data = pd.DataFrame({"time": np.arange(len(values)), "value": values, "feature_a": rng.random(len(values))})
+        scored = score_anomalies(data, "mad", chunk_size=3000)
+        parallel = score_anomalies(data, "mad", chunk_size=7000, n_jobs=2)
+        scorer = AnomalyScorer("mad")
+        streamed = pd.concat([scorer.update(data.iloc[start:start + 1234]) for start in range(0, len(data), 1234)])
+        np.testing.assert_allclose(parallel["anomaly_score"], scored["anomaly_score"])
+        np.testing.assert_allclose(streamed["anomaly_score"], scored["anomaly_score"])
+        self.assertTrue(scored["anomaly"].iloc[[5000, 12_000]].all())
+        self.assertNotIn("anomaly", data.columns)
+
+        forest = score_anomalies(data, "isolation_forest", threshold=0.0)
+        self.assertTrue(forest["anomaly"].all())
+        with self.assertRaises(ValueError):
+            score_anomalies(data, "unknown")
+
+    def test_anomaly_scorer_skips_empty_chunks(self):
+        """
+        Test streaming anomaly scoring with empty chunks.
+
+        Verify that an empty chunk yields an empty scored chunk and does not change the scores of later chunks.
+        """
+        values = np.random.default_rng(0).normal(size=500)
+        data = pd.DataFrame({"time": np.arange(len(values)), "value": values, "feature_a": values ** 2})
+        for method in ("mad", "isolation_forest"):
+            scorer = AnomalyScorer(method)
+            empty = scorer.update(data.iloc[:0])
+            self.assertEqual(len(empty), 0)
+            self.assertEqual(empty["anomaly"].dtype, bool)
+            chunks = [scorer.update(data.iloc[:250]), scorer.update(data.iloc[250:250]), scorer.update(data.iloc[250:])]
+            reference = AnomalyScorer(method)
+            expected = pd.concat([reference.update(data.iloc[:250]), reference.update(data.iloc[250:])])
+            np.testing.assert_allclose(pd.concat(chunks)["anomaly_score"], expected["anomaly_score"])
+
+    def test_load_data_writes_and_reuses_converted_input(self):
+        """
+        Test the converted Feather copy of a CSV input.
+
+        Verify that the first read writes it, later reads skip CSV parsing, and only requested columns are loaded.
+        """
+        frame = pd.DataFrame({
+            "time": np.arange(20),
+            "value": np.random.rand(20),
+            "anomaly": [False] * 19 + [True],
+            "anomaly_score": np.random.rand(20),
+            "feature_a": np.random.rand(20),
+            "label": ["x"] * 20,
+        })
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "data.csv")
+            frame.to_csv(path, index=False)
+            load_data(path, cache=True)
+            self.assertTrue(os.path.exists(converted_cache_path(path)))
+            with patch("pandas.read_csv", side_effect=AssertionError("CSV parsed")):
+                loaded = load_data(path, columns=["time", "anomaly"])
+                self.assertEqual(feature_columns(path), ["anomaly_score", "feature_a"])
+            self.assertEqual(list(loaded.columns), ["time", "anomaly"])
+            self.assertEqual(loaded["anomaly"].tolist(), frame["anomaly"].tolist())
+
+    def test_parquet_input(self):
+        """
+        Test Parquet input for the visualisations and the chunked reader.
+
+        Verify that a file path is accepted by the visualize functions and read in chunks of the requested size.
+        """
+        frame = pd.DataFrame({
+            "time": np.arange(50),
+            "value": np.random.rand(50),
+            "anomaly": [False] * 49 + [True],
+            "anomaly_score": np.random.rand(50),
+            "feature_a": np.random.rand(50),
+            "feature_b": np.random.rand(50),
+        })
+        with tempfile.TemporaryDirectory() as directory, patch("your_module.output_path", directory), \
+                patch("matplotlib.pyplot.show"):
+            path = os.path.join(directory, "data.parquet")
+            frame.to_parquet(path)
+            self.assertEqual([len(chunk) for chunk in read_in_chunks(path, chunk_size=20)], [20, 20, 10])
+            visualize_time_series_anomalies(path)
+            visualize_anomaly_scores(path)
+            visualize_multi_dim_anomalies(path, use_cache=False)
+            self.assertEqual(len([name for name in os.listdir(directory) if name.endswith(".png")]), 3)
+
+    def test_stage_profiling_report(self):
+        """
+        Test stage-level profiling.
+
+        Verify that calls are recorded with rows and timings, summed per stage in the JSON report, and dumped to pstats on request.
+        """
+        @profile_stage
+        def stage(data):
+            return data * 2
+
+        del stage_timings[:]
+        with tempfile.TemporaryDirectory() as directory, patch("your_module.output_path", directory), \
+                patch("your_module.profiled_stages", {"stage"}):
+            stage(self.time_series_data)
+            stage(self.time_series_data)
+            report = write_timing_report()
+            with open(os.path.join(directory, "timing_report.json")) as f:
+                self.assertEqual(json.load(f)["stages"]["stage"]["calls"], 2)
+            self.assertTrue(os.path.exists(os.path.join(directory, "stage.pstats")))
+        self.assertEqual(report["stages"]["stage"]["rows"], 2 * len(self.time_series_data))
+        self.assertGreaterEqual(report["calls"][0]["wall_time"], 0.0)
+        self.assertEqual(report["calls"][0]["status"], "ok")
+
+    def test_stage_profiling_nested_and_per_run(self):
+        """
+        Test nested profiled stages and timings across runs.
+
+        Verify that a stage nested in a profiled stage is only timed, and that main() starts a fresh timing list.
+        """
+        @profile_stage
+        def inner(data):
+            return data
+
+        @profile_stage
+        def outer(data):
+            return inner(data)
+
+        del stage_timings[:]
+        with tempfile.TemporaryDirectory() as directory, patch("your_module.output_path", directory), \
+                patch("your_module.profiled_stages", {"outer", "inner"}):
+            outer(self.time_series_data)
+            self.assertEqual(sorted(os.listdir(directory)), ["outer.pstats"])
+            inner(self.time_series_data)
+            self.assertEqual(sorted(os.listdir(directory)), ["inner.pstats", "outer.pstats"])
+        self.assertEqual([record["stage"] for record in stage_timings], ["inner", "outer", "inner"])
+
+        with patch("your_module.load_data", side_effect=RuntimeError("stop")), self.assertLogs(level="ERROR"):
+            with self.assertRaises(RuntimeError):
+                main()
+        self.assertEqual(stage_timings, [])
+
     def test_handle_exception(self):
         """
         Test exception handling decorator.
@@ -0,0 +1,434 @@
+# Disclaimer: This output contains AI-generated content; user is advised to review it before consumption.
+#*Start of AI Generated Content*
+
+# *****************************************
+# *                                       *
+# *  Benchmark Suite for PostgreSQL DB   *
+# *                                       *
+# *****************************************
+#
+# Measures p50/p95/p99 latency and throughput of sum_of_values/calculate_age
+# in cold-connection, pooled, cached and batched modes and writes the results
+# as JSON. A throwaway PostgreSQL cluster is started when initdb/pg_ctl are
+# available; otherwise an in-process stand-in with configurable connect and
+# round-trip latency is used.
+#
+# Usage:
+#     python BenchmarkSuite.py --rows 100000 --iterations 500 --output bench.json
+
+import argparse
+import datetime
+import getpass
+import glob
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+import psycopg2
+from psycopg2 import sql
+
+import your_module as db  # Replace 'your_module' with the actual module name
+
+
+# *****************************************
+# *                                       *
+# *  Constants                           *
+# *                                       *
+# *****************************************
+
+BENCH_TABLE = "bench_employees"
+BENCH_SALARY_COLUMN = "salary"
+BENCH_BIRTHDATE_COLUMN = "birthdate"
+DEFAULT_ROWS = 100000
+DEFAULT_ITERATIONS = 200
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_CONNECT_LATENCY_MS = 5.0  # stand-in TCP + auth handshake
+DEFAULT_QUERY_LATENCY_MS = 0.5  # stand-in network round-trip per statement
+MODES = ("cold", "pooled", "cached", "batched")
+
+CREATE_BENCH_TABLE_SQL = (
+    "DROP TABLE IF EXISTS {table}; "
+    "CREATE TABLE {table} (id integer PRIMARY KEY, salary numeric NOT NULL, birthdate date NOT NULL)"
+)
+SEED_BENCH_TABLE_SQL = (
+    "INSERT INTO {table} "
+    "SELECT g, round((random() * 100000)::numeric, 2), date '1960-01-01' + (random() * 20000)::integer "
+    "FROM generate_series(1, %s) AS g"
+)
+
+
+# *****************************************
+# *                                       *
+# *  Throwaway PostgreSQL Cluster        *
+# *                                       *
+# *****************************************
+
+def find_postgres_bin():
+    """
+    Locate the directory holding initdb and pg_ctl.
+
+    Returns:
+        bin_dir (str): Directory of the PostgreSQL server binaries, or None if not installed
+    """
+    initdb = shutil.which("initdb")
+    if initdb:
+        return os.path.dirname(initdb)
+    candidates = sorted(glob.glob("/usr/lib/postgresql/*/bin/initdb"))
+    return os.path.dirname(candidates[-1]) if candidates else None
+
+
+class ThrowawayPostgres:
+    """
+    Temporary PostgreSQL cluster listening only on a private Unix socket.
+
+    Args:
+        bin_dir (str): Directory of initdb and pg_ctl
+    """
+
+    def __init__(self, bin_dir):
+        self.bin_dir = bin_dir
+        self.directory = tempfile.mkdtemp(prefix="pg_bench_")
+        self.data_dir = os.path.join(self.directory, "data")
+        self.user = getpass.getuser()
+
+    def start(self):
+        subprocess.run(
+            [os.path.join(self.bin_dir, "initdb"), "-D", self.data_dir, "-A", "trust", "-U", self.user],
+            check=True, capture_output=True,
+        )
+        subprocess.run(
+            [os.path.join(self.bin_dir, "pg_ctl"), "-D", self.data_dir, "-w", "-l",
+             os.path.join(self.directory, "server.log"),
+             "-o", f"-k {self.directory} -c listen_addresses=''", "start"],
+            check=True, capture_output=True,
+        )
+
+    def stop(self):
+        subprocess.run(
+            [os.path.join(self.bin_dir, "pg_ctl"), "-D", self.data_dir, "-m", "fast", "stop"],
+            capture_output=True,
+        )
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def configure_module(self):
+        """
+        Point the database module at this cluster.
+        """
+        db.DB_HOST = self.directory
+        db.DB_NAME = "postgres"
+        db.DB_USER = self.user
+        db.DB_PASSWORD = ""
+
+    def seed(self, rows):
+        connection = db.establish_db_connection()
+        table = sql.Identifier(BENCH_TABLE)
+        with connection.cursor() as cursor:
+            cursor.execute(sql.SQL(CREATE_BENCH_TABLE_SQL).format(table=table))
+            cursor.execute(sql.SQL(SEED_BENCH_TABLE_SQL).format(table=table), (rows,))
+            cursor.execute(sql.SQL("ANALYZE {}").format(table))
+        connection.commit()
+        connection.close()
+
+
+# *****************************************
+# *                                       *
+# *  In-Process Stand-In Database        *
+# *                                       *
+# *****************************************
+
+def _statement_text(query):
+    """
+    Flatten a str or psycopg2.sql.Composable into plain statement text without a live connection.
+    """
+    if isinstance(query, str):
+        return query
+    if isinstance(query, sql.Composed):
+        return "".join(_statement_text(part) for part in query.seq)
+    if isinstance(query, sql.Identifier):
+        return ".".join(query.strings)
+    if isinstance(query, sql.Placeholder):
+        return "%s"
+    if isinstance(query, sql.Literal):
+        return repr(query.wrapped)
+    return query.string
+
+
+class StandInDatabase:
+    """
+    In-memory table plus latency model that stands in for a PostgreSQL server.
+
+    It understands exactly the statements the module issues: SUM over the
+    salary column, AGE by ID array or for the whole table, PREPARE/EXECUTE/
+    DEALLOCATE and the pool health-check ping. Every connect sleeps for the
+    handshake latency and every statement for the round-trip latency.
+
+    Args:
+        rows (int): Number of rows to seed
+        connect_latency (float): Seconds per connect
+        query_latency (float): Seconds per statement round-trip
+    """
+
+    def __init__(self, rows, connect_latency, query_latency, seed=42):
+        rng = random.Random(seed)
+        today = datetime.date.today()
+        self.salaries = [round(rng.uniform(0, 100000), 2) for _ in range(rows)]
+        self.ages = {}
+        for person_id in range(1, rows + 1):
+            birthdate = datetime.date(1960, 1, 1) + datetime.timedelta(days=rng.randrange(20000))
+            self.ages[person_id] = f"{(today - birthdate).days // 365} years"
+        self.connect_latency = connect_latency
+        self.query_latency = query_latency
+
+    def connect(self, *args, **kwargs):
+        time.sleep(self.connect_latency)
+        return StandInConnection(self)
+
+
+class StandInConnection:
+
+    def __init__(self, database):
+        self.database = database
+        self.prepared = {}
+        self.closed = 0
+        self.autocommit = False
+
+    def cursor(self, name=None):
+        return StandInCursor(self)
+
+    def rollback(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+class StandInCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.itersize = 2000
+        self._rows = []
+
+    def execute(self, query, params=None):
+        time.sleep(self.connection.database.query_latency)
+        text = _statement_text(query)
+        words = text.split(None, 3)
+        if words[0] == "PREPARE":
+            self.connection.prepared[words[1]] = words[3]
+            self._rows = []
+            return
+        if words[0] == "DEALLOCATE":
+            self.connection.prepared.pop(words[1], None)
+            return
+        if words[0] == "EXECUTE":
+            text = self.connection.prepared[words[1].split("(")[0]]
+        self._rows = self._run(text, params)
+
+    def _run(self, text, params):
+        database = self.connection.database
+        if text.startswith("SELECT 1"):
+            return [(1,)]
+        if text.startswith("SELECT SUM("):
+            return [(sum(database.salaries),)]
+        if "AGE(" in text and "ANY(" in text:
+            return [(person_id, database.ages[person_id]) for person_id in params[0] if person_id in database.ages]
+        if "AGE(" in text:
+            return list(database.ages.items())
+        raise psycopg2.ProgrammingError(f"stand-in cannot run: {text}")
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchmany(self, size=1):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def __iter__(self):
+        while self._rows:
+            yield self._rows.pop(0)
+
+    def close(self):
+        self._rows = []
+
+
+# *****************************************
+# *                                       *
+# *  Measurement                         *
+# *                                       *
+# *****************************************
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def measure(operation, iterations, items_per_call=1):
+    """
+    Run an operation repeatedly and summarise its latency.
+
+    Args:
+        operation (callable): Zero-argument function to time
+        iterations (int): Number of timed calls
+        items_per_call (int, optional): Rows/IDs handled per call, for throughput. Defaults to 1.
+
+    Returns:
+        summary (dict): p50/p95/p99/mean latency in milliseconds, calls and items per second
+    """
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        operation()
+        latencies.append((time.perf_counter() - call_started) * 1000.0)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "mean_ms": sum(latencies) / len(latencies),
+        "qps": iterations / elapsed,
+        "items_per_second": iterations * items_per_call / elapsed,
+    }
+
+
+def cold_sum_of_values(table_name, column_name):
+    """
+    The original connect-query-close path, kept as the baseline.
+    """
+    connection = db.establish_db_connection()
+    cursor = connection.cursor()
+    cursor.execute(db.SUM_VALUES_QUERY.format(column_name=column_name, table_name=table_name))
+    result = cursor.fetchone()[0]
+    connection.close()
+    return result
+
+
+def run_modes(modes, rows, iterations, batch_size):
+    """
+    Benchmark each requested mode against the currently configured database.
+
+    Returns:
+        results (dict): Mode name -> measure() summary
+    """
+    rng = random.Random(7)
+    results = {}
+    for mode in modes:
+        db.close_db_pool()
+        db.disable_query_cache()
+        if mode == "cold":
+            results[mode] = measure(lambda: cold_sum_of_values(BENCH_TABLE, BENCH_SALARY_COLUMN), iterations)
+        elif mode == "pooled":
+            db.sum_of_values(BENCH_TABLE, BENCH_SALARY_COLUMN)  # warm the pool and statement cache
+            results[mode] = measure(lambda: db.sum_of_values(BENCH_TABLE, BENCH_SALARY_COLUMN), iterations)
+            results["pooled_age"] = measure(
+                lambda: db.calculate_age(BENCH_TABLE, BENCH_BIRTHDATE_COLUMN, rng.randint(1, rows)), iterations)
+        elif mode == "cached":
+            db.enable_query_cache(listen=False)
+            results[mode] = measure(lambda: db.sum_of_values(BENCH_TABLE, BENCH_SALARY_COLUMN), iterations)
+        elif mode == "batched":
+            size = min(batch_size, rows)
+            results[mode] = measure(
+                lambda: list(db.calculate_ages(BENCH_TABLE, BENCH_BIRTHDATE_COLUMN, rng.sample(range(1, rows + 1), size))),
+                iterations, items_per_call=size)
+    db.close_db_pool()
+    db.disable_query_cache()
+    return results
+
+
+def run_benchmarks(rows=DEFAULT_ROWS, iterations=DEFAULT_ITERATIONS, batch_size=DEFAULT_BATCH_SIZE, modes=MODES,
+                   stand_in=False, connect_latency_ms=DEFAULT_CONNECT_LATENCY_MS,
+                   query_latency_ms=DEFAULT_QUERY_LATENCY_MS):
+    """
+    Start a database, seed it and benchmark the requested modes.
+
+    Args:
+        rows (int): Rows to seed
+        iterations (int): Timed calls per mode
+        batch_size (int): IDs per calculate_ages call in batched mode
+        modes (iterable of str): Subset of MODES to run
+        stand_in (bool): Use the in-process stand-in even if PostgreSQL is installed
+        connect_latency_ms (float): Stand-in connect latency
+        query_latency_ms (float): Stand-in round-trip latency
+
+    Returns:
+        report (dict): Machine-readable benchmark report
+    """
+    bin_dir = None if stand_in else find_postgres_bin()
+    report = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "rows": rows,
+        "iterations": iterations,
+        "batch_size": batch_size,
+    }
+    if bin_dir:
+        server = ThrowawayPostgres(bin_dir)
+        try:
+            server.start()
+            server.configure_module()
+            server.seed(rows)
+            report["backend"] = "postgresql"
+            report["results"] = run_modes(modes, rows, iterations, batch_size)
+        finally:
+            server.stop()
+    else:
+        database = StandInDatabase(rows, connect_latency_ms / 1000.0, query_latency_ms / 1000.0)
+        report["backend"] = "stand-in"
+        report["connect_latency_ms"] = connect_latency_ms
+        report["query_latency_ms"] = query_latency_ms
+        with patch("psycopg2.connect", database.connect):
+            report["results"] = run_modes(modes, rows, iterations, batch_size)
+    return report
+
+
+# *****************************************
+# *                                       *
+# *  Command Line Entry Point            *
+# *                                       *
+# *****************************************
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the PostgreSQL helper module.")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="rows to seed")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="timed calls per mode")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="IDs per batched call")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES), help="modes to run")
+    parser.add_argument("--stand-in", action="store_true", help="force the in-process stand-in database")
+    parser.add_argument("--connect-latency-ms", type=float, default=DEFAULT_CONNECT_LATENCY_MS)
+    parser.add_argument("--query-latency-ms", type=float, default=DEFAULT_QUERY_LATENCY_MS)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.rows, args.iterations, args.batch_size, args.modes, args.stand_in,
+                            args.connect_latency_ms, args.query_latency_ms)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
+
+
+#*End of AI Generated Content*
@@ -16,12 +16,119 @@ DB_PASSWORD = 'mypassword'
 
 # SQL Queries
 SUM_VALUES_QUERY = "SELECT SUM({column_name}) FROM {table_name}"
-CALCULATE_AGE_QUERY = "SELECT AGE({birthdate_column}) FROM {table_name} WHERE id = {person_id}"
+CALCULATE_AGES_QUERY = "SELECT id, AGE({birthdate_column}) FROM {table_name} WHERE id = ANY(%s)"
+STREAM_AGES_QUERY = "SELECT id, AGE({birthdate_column}) FROM {table_name}"
+
+# Table Change Notification SQL
+TABLE_CHANGE_CHANNEL = "table_changes"
+TABLE_CHANGE_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION notify_table_change() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(TG_ARGV[0], TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+DROP_TABLE_CHANGE_TRIGGER_SQL = "DROP TRIGGER IF EXISTS {trigger} ON {table}"
+TABLE_CHANGE_TRIGGER_SQL = (
+    "CREATE TRIGGER {trigger} AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+    "FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change({channel})"
+)
+
+# Running Total (Incremental SUM) SQL
+RUNNING_TOTALS_TABLE = "running_totals"
+RUNNING_TOTAL_QUERY = "SELECT total, value_count FROM running_totals WHERE table_name = %s AND column_name = %s"
+RUNNING_TOTALS_EXISTS_QUERY = "SELECT to_regclass(%s)"
+CREATE_RUNNING_TOTALS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS running_totals (
+    table_name text NOT NULL,
+    column_name text NOT NULL,
+    total numeric NOT NULL DEFAULT 0,
+    value_count bigint NOT NULL DEFAULT 0,
+    PRIMARY KEY (table_name, column_name)
+)
+"""
+RUNNING_TOTAL_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        UPDATE running_totals SET total = 0, value_count = 0
+        WHERE table_name = {table_key} AND column_name = {column_key};
+    ELSIF TG_OP = 'INSERT' THEN
+        UPDATE running_totals
+        SET total = total + (SELECT COALESCE(SUM({column}), 0) FROM new_rows),
+            value_count = value_count + (SELECT COUNT({column}) FROM new_rows)
+        WHERE table_name = {table_key} AND column_name = {column_key};
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE running_totals
+        SET total = total - (SELECT COALESCE(SUM({column}), 0) FROM old_rows),
+            value_count = value_count - (SELECT COUNT({column}) FROM old_rows)
+        WHERE table_name = {table_key} AND column_name = {column_key};
+    ELSE
+        UPDATE running_totals
+        SET total = total + (SELECT COALESCE(SUM({column}), 0) FROM new_rows)
+                          - (SELECT COALESCE(SUM({column}), 0) FROM old_rows),
+            value_count = value_count + (SELECT COUNT({column}) FROM new_rows)
+                                      - (SELECT COUNT({column}) FROM old_rows)
+        WHERE table_name = {table_key} AND column_name = {column_key};
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+RUNNING_TOTAL_TRIGGERS_SQL = (
+    ("insert", "AFTER INSERT ON {table} REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT"),
+    ("update", "AFTER UPDATE ON {table} REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT"),
+    ("delete", "AFTER DELETE ON {table} REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT"),
+    ("truncate", "AFTER TRUNCATE ON {table} FOR EACH STATEMENT"),
+)
+INITIALISE_RUNNING_TOTAL_SQL = """
+INSERT INTO running_totals (table_name, column_name, total, value_count)
+SELECT {table_key}, {column_key}, COALESCE(SUM({column}), 0), COUNT({column}) FROM {table}
+ON CONFLICT (table_name, column_name) DO UPDATE SET total = EXCLUDED.total, value_count = EXCLUDED.value_count
+"""
+
+# Aggregate Query Building Blocks
+AGGREGATE_FUNCTIONS = ("SUM", "AVG", "COUNT", "MIN", "MAX")
+WHERE_OPERATORS = ("=", "<>", "!=", "<", "<=", ">", ">=", "IN")
 
 # Error Messages
 DB_CONNECTION_ERROR = "Failed to connect to the database"
 INVALID_TABLE_ERROR = "Invalid table name"
 INVALID_COLUMN_ERROR = "Invalid column name"
+INVALID_AGGREGATE_ERROR = "Unsupported aggregate function"
+INVALID_OPERATOR_ERROR = "Unsupported comparison operator"
+DB_POOL_EXHAUSTED_ERROR = "Timed out waiting for a pooled database connection"
+INVALID_PERSON_ID_ERROR = "Invalid person ID"
+
+# Connection Pool Settings
+DB_POOL_MIN_SIZE = 1
+DB_POOL_MAX_SIZE = 10
+DB_POOL_TIMEOUT = 30.0  # seconds to wait for a free connection
+DB_POOL_HEALTH_CHECK_INTERVAL = 60.0  # ping connections idle for longer than this
+
+# Prepared Statement Settings
+PREPARED_STATEMENT_CACHE_SIZE = 32  # statements kept per connection; 0 disables PREPARE/EXECUTE
+
+# Instrumentation Settings
+SLOW_QUERY_THRESHOLD = 1.0  # seconds of execute + fetch time before a query is logged as slow
+EXPLAIN_SLOW_QUERIES = False  # re-run slow queries under EXPLAIN (ANALYZE, BUFFERS); doubles their cost
+SLOW_QUERY_LOG_SIZE = 100  # most recent slow queries kept in memory
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_COUNT_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000)
+
+# Async Settings
+ASYNC_MAX_WORKERS = DB_POOL_MAX_SIZE  # queries in flight at once; more would only queue on the pool
+
+# Result Cache Settings
+QUERY_CACHE_TTL = 300.0  # seconds; upper bound on staleness if a notification is missed
+QUERY_CACHE_MAX_ENTRIES = 10000
+QUERY_CACHE_MAX_BYTES = 16 * 1024 * 1024
+TABLE_CHANGE_POLL_INTERVAL = 1.0  # seconds between listener wake-ups
+
+# Batch Settings
+AGE_BATCH_SIZE = 10000  # person IDs sent per ANY(%s) round-trip
+STREAM_ITERSIZE = 5000  # rows fetched per round-trip by server-side cursors
 
 
 # *****************************************
@@ -30,8 +137,22 @@ INVALID_COLUMN_ERROR = "Invalid column name"
 # *                                       *
 # *****************************************
 
+import asyncio
+import logging
+import select
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import count, islice
+from contextlib import contextmanager
+
 import psycopg2
-from psycopg2 import Error
+from psycopg2 import Error, InterfaceError, OperationalError, sql
+from psycopg2.pool import PoolError
 
 def establish_db_connection():
     """
@@ -40,6 +161,7 @@ def establish_db_connection():
     Returns:
         connection (psycopg2.extensions.connection): Database connection object
     """
+    started = time.perf_counter()
     try:
         connection = psycopg2.connect(
             dbname=DB_NAME,
@@ -47,49 +169,1062 @@ def establish_db_connection():
             password=DB_PASSWORD,
             host=DB_HOST
         )
+        _query_metrics.observe_connect(time.perf_counter() - started)
         return connection
     except Error as e:
+        _query_metrics.observe_connect_error()
         print(DB_CONNECTION_ERROR, e)
         return None
 
 
+# *****************************************
+# *                                       *
+# *  Query Instrumentation               *
+# *                                       *
+# *****************************************
+
+class Histogram:
+    """
+    Fixed-bucket histogram in the layout Prometheus expects.
+
+    Args:
+        buckets (tuple of float): Upper bounds of the buckets, ascending
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        Return (upper bound, cumulative count) pairs, ending with "+Inf".
+        """
+        total = 0
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        pairs = []
+        for bound, bucket_count in zip(bounds, self.counts):
+            total += bucket_count
+            pairs.append((bound, total))
+        return pairs
+
+
+class QueryMetrics:
+    """
+    Thread-safe store of connect and per-template query timings.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connect_seconds = Histogram(LATENCY_BUCKETS)
+            self.connect_errors = 0
+            self.templates = {}  # template -> {"execute_seconds", "fetch_seconds", "rows"} histograms
+            self.query_errors = {}
+            self.slow_queries = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+
+    def observe_connect(self, seconds):
+        with self._lock:
+            self.connect_seconds.observe(seconds)
+
+    def observe_connect_error(self):
+        with self._lock:
+            self.connect_errors += 1
+
+    def observe_query(self, template, execute_seconds, fetch_seconds, rows):
+        with self._lock:
+            histograms = self.templates.get(template)
+            if histograms is None:
+                histograms = self.templates[template] = {
+                    "execute_seconds": Histogram(LATENCY_BUCKETS),
+                    "fetch_seconds": Histogram(LATENCY_BUCKETS),
+                    "rows": Histogram(ROW_COUNT_BUCKETS),
+                }
+            histograms["execute_seconds"].observe(execute_seconds)
+            histograms["fetch_seconds"].observe(fetch_seconds)
+            histograms["rows"].observe(rows)
+
+    def observe_query_error(self, template):
+        with self._lock:
+            self.query_errors[template] = self.query_errors.get(template, 0) + 1
+
+    def record_slow_query(self, entry):
+        with self._lock:
+            self.slow_queries.append(entry)
+
+    def snapshot(self):
+        """
+        Return the current metrics as plain data.
+
+        Returns:
+            metrics (dict): connect histogram, per-template histograms, error counts and recent slow queries
+        """
+        def histogram_dict(histogram):
+            return {"buckets": histogram.cumulative(), "sum": histogram.sum, "count": histogram.count}
+
+        with self._lock:
+            return {
+                "connect_seconds": histogram_dict(self.connect_seconds),
+                "connect_errors": self.connect_errors,
+                "queries": {
+                    template: {name: histogram_dict(histogram) for name, histogram in histograms.items()}
+                    for template, histograms in self.templates.items()
+                },
+                "query_errors": dict(self.query_errors),
+                "slow_queries": list(self.slow_queries),
+            }
+
+    def export_prometheus(self):
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Returns:
+            text (str): Metrics page for a scraper
+        """
+        lines = []
+
+        def histogram_lines(name, histogram, labels=""):
+            prefix = labels + "," if labels else ""
+            for bound, total in histogram.cumulative():
+                lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {total}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{name}_sum{suffix} {histogram.sum}")
+            lines.append(f"{name}_count{suffix} {histogram.count}")
+
+        with self._lock:
+            lines.append("# TYPE db_connect_seconds histogram")
+            histogram_lines("db_connect_seconds", self.connect_seconds)
+            lines.append("# TYPE db_connect_errors_total counter")
+            lines.append(f"db_connect_errors_total {self.connect_errors}")
+            for name in ("execute_seconds", "fetch_seconds", "rows"):
+                lines.append(f"# TYPE db_query_{name} histogram")
+                for template, histograms in sorted(self.templates.items()):
+                    histogram_lines(f"db_query_{name}", histograms[name], f'template="{template}"')
+            lines.append("# TYPE db_query_errors_total counter")
+            for template, errors in sorted(self.query_errors.items()):
+                lines.append(f'db_query_errors_total{{template="{template}"}} {errors}')
+        return "\n".join(lines) + "\n"
+
+
+_query_metrics = QueryMetrics()
+
+
+class QueryTimer:
+    """
+    Times one query: execute and fetch phases, row count and slow-query capture.
+
+    Use as a context manager; call executed() once the statement has run and
+    fetch the results through fetch_one(), fetch_rows() or fetch_next() so
+    only the time spent fetching (not the caller's processing) is counted.
+
+    Args:
+        template (str): Label the timings are grouped under
+        connection (psycopg2.extensions.connection, optional): Connection used for EXPLAIN capture
+        query (str or psycopg2.sql.Composable, optional): Query text for the slow-query log and EXPLAIN
+        params (tuple or list, optional): Query parameters
+    """
+
+    def __init__(self, template, connection=None, query=None, params=None):
+        self.template = template
+        self.connection = connection
+        self.query = query
+        self.params = params
+        self.execute_seconds = 0.0
+        self.fetch_seconds = 0.0
+        self.rows = 0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def executed(self):
+        self.execute_seconds = time.perf_counter() - self._started
+
+    def fetch_one(self, cursor):
+        started = time.perf_counter()
+        row = cursor.fetchone()
+        self.fetch_seconds += time.perf_counter() - started
+        if row is not None:
+            self.rows += 1
+        return row
+
+    def fetch_rows(self, fetch, *args):
+        started = time.perf_counter()
+        rows = fetch(*args)
+        self.fetch_seconds += time.perf_counter() - started
+        self.rows += len(rows)
+        return rows
+
+    def fetch_next(self, rows):
+        started = time.perf_counter()
+        row = next(rows, None)
+        self.fetch_seconds += time.perf_counter() - started
+        if row is not None:
+            self.rows += 1
+        return row
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            _query_metrics.observe_query(self.template, self.execute_seconds, self.fetch_seconds, self.rows)
+            if self.execute_seconds + self.fetch_seconds >= SLOW_QUERY_THRESHOLD:
+                self._report_slow_query()
+        elif issubclass(exc_type, Exception):
+            _query_metrics.observe_query_error(self.template)
+        return False
+
+    def _report_slow_query(self):
+        entry = {
+            "template": self.template,
+            "query": str(self.query),
+            "execute_seconds": self.execute_seconds,
+            "fetch_seconds": self.fetch_seconds,
+            "rows": self.rows,
+            "plan": None,
+        }
+        if EXPLAIN_SLOW_QUERIES and self.connection is not None and self.query is not None:
+            entry["plan"] = explain_query(self.connection, self.query, self.params)
+        _query_metrics.record_slow_query(entry)
+        logging.warning(
+            f"Slow query {self.template}: execute {self.execute_seconds:.3f}s, "
+            f"fetch {self.fetch_seconds:.3f}s, {self.rows} rows"
+            + (f"\n{entry['plan']}" if entry["plan"] else "")
+        )
+
+
+def explain_query(connection, query, params=None):
+    """
+    Run a query under EXPLAIN (ANALYZE, BUFFERS) and return the plan text.
+
+    Args:
+        connection (psycopg2.extensions.connection): Connection to run on
+        query (str or psycopg2.sql.Composable): Query to explain
+        params (tuple or list, optional): Query parameters
+
+    Returns:
+        plan (str): Plan with actual timings and buffer usage, or None if EXPLAIN failed
+    """
+    statement = query if isinstance(query, sql.Composable) else sql.SQL(query)
+    try:
+        cursor = connection.cursor()
+        cursor.execute(sql.SQL("EXPLAIN (ANALYZE, BUFFERS) ") + statement, params)
+        return "\n".join(row[0] for row in cursor.fetchall())
+    except Error as e:
+        logging.warning(f"EXPLAIN failed: {e}")
+        return None
+
+
+def get_query_metrics():
+    """
+    Return connect/execute/fetch histograms, row counts and recent slow queries.
+
+    Returns:
+        metrics (dict): See QueryMetrics.snapshot()
+    """
+    return _query_metrics.snapshot()
+
+
+def export_query_metrics():
+    """
+    Return the query metrics as a Prometheus text page for a metrics scraper.
+
+    Returns:
+        text (str): Metrics in the Prometheus text exposition format
+    """
+    return _query_metrics.export_prometheus()
+
+
+def reset_query_metrics():
+    """
+    Clear all recorded query metrics.
+    """
+    _query_metrics.reset()
+
+
+# *****************************************
+# *                                       *
+# *  PostgreSQL Connection Pool          *
+# *                                       *
+# *****************************************
+
+class DBConnectionPool:
+    """
+    Thread-safe pool of PostgreSQL connections.
+
+    Connections are opened through establish_db_connection() and handed back
+    to the pool after use instead of being closed, so the TCP/auth handshake
+    is only paid when the pool has to grow.
+
+    Args:
+        min_size (int): Number of connections opened up front
+        max_size (int): Upper bound on open connections
+        timeout (float): Seconds to wait for a free connection before failing
+        health_check_interval (float): Idle time after which a connection is pinged on checkout
+    """
+
+    def __init__(self, min_size=DB_POOL_MIN_SIZE, max_size=DB_POOL_MAX_SIZE,
+                 timeout=DB_POOL_TIMEOUT, health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._idle = deque()  # (connection, last_used) pairs
+        self._size = 0
+        self._cond = threading.Condition()
+        self._stats = {"hits": 0, "misses": 0, "waits": 0, "wait_time": 0.0, "discarded": 0}
+        for _ in range(min_size):
+            connection = establish_db_connection()
+            if connection is None:
+                break
+            self._idle.append((connection, time.monotonic()))
+            self._size += 1
+
+    def acquire(self):
+        """
+        Check a connection out of the pool, opening a new one if allowed.
+
+        Returns:
+            connection (psycopg2.extensions.connection): Database connection object, or None if connecting failed
+
+        Raises:
+            PoolError: If no connection becomes free within the pool timeout
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._cond:
+                wait_start = None
+                while not self._idle and self._size >= self.max_size:
+                    if wait_start is None:
+                        wait_start = time.monotonic()
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._record_wait(wait_start)
+                        raise PoolError(DB_POOL_EXHAUSTED_ERROR)
+                    self._cond.wait(remaining)
+                if wait_start is not None:
+                    self._record_wait(wait_start)
+                if self._idle:
+                    connection, last_used = self._idle.pop()
+                else:
+                    connection, last_used = None, None
+                    self._size += 1
+
+            if connection is None:
+                connection = establish_db_connection()
+                with self._cond:
+                    if connection is None:
+                        self._size -= 1
+                        self._cond.notify()
+                    else:
+                        self._stats["misses"] += 1
+                return connection
+
+            if self._is_healthy(connection, last_used):
+                with self._cond:
+                    self._stats["hits"] += 1
+                return connection
+            self._discard(connection)
+
+    def release(self, connection, discard=False):
+        """
+        Return a connection to the pool.
+
+        Args:
+            connection (psycopg2.extensions.connection): Connection obtained from acquire()
+            discard (bool): Close the connection instead of keeping it, e.g. after a connection-level error
+        """
+        if connection is None:
+            return
+        if not discard:
+            try:
+                connection.rollback()
+            except Error:
+                discard = True
+        if discard:
+            self._discard(connection)
+            return
+        with self._cond:
+            self._idle.append((connection, time.monotonic()))
+            self._cond.notify()
+
+    def close(self):
+        """
+        Close all idle connections held by the pool.
+        """
+        with self._cond:
+            idle, self._idle = self._idle, deque()
+            self._size -= len(idle)
+        for connection, _ in idle:
+            try:
+                connection.close()
+            except Error:
+                pass
+
+    def stats(self):
+        """
+        Snapshot of the pool counters.
+
+        Returns:
+            stats (dict): hits, misses, waits, wait_time (seconds), discarded, size and idle counts
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats["size"] = self._size
+            stats["idle"] = len(self._idle)
+        return stats
+
+    def _is_healthy(self, connection, last_used):
+        if connection.closed:
+            return False
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            connection.rollback()
+            return True
+        except Error:
+            return False
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Error:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._stats["discarded"] += 1
+            self._cond.notify()
+
+    def _record_wait(self, wait_start):
+        self._stats["waits"] += 1
+        self._stats["wait_time"] += time.monotonic() - wait_start
+
+
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+
+def get_db_pool():
+    """
+    Return the module-level connection pool, creating it on first use.
+
+    Returns:
+        pool (DBConnectionPool): Shared connection pool
+    """
+    global _db_pool
+    with _db_pool_lock:
+        if _db_pool is None:
+            _db_pool = DBConnectionPool()
+        return _db_pool
+
+
+def configure_db_pool(min_size=DB_POOL_MIN_SIZE, max_size=DB_POOL_MAX_SIZE,
+                      timeout=DB_POOL_TIMEOUT, health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL):
+    """
+    Replace the module-level connection pool with one using the given settings.
+
+    Args:
+        min_size (int): Number of connections opened up front
+        max_size (int): Upper bound on open connections
+        timeout (float): Seconds to wait for a free connection
+        health_check_interval (float): Idle time after which a connection is pinged on checkout
+
+    Returns:
+        pool (DBConnectionPool): The new shared connection pool
+    """
+    global _db_pool
+    pool = DBConnectionPool(min_size, max_size, timeout, health_check_interval)
+    with _db_pool_lock:
+        previous, _db_pool = _db_pool, pool
+    if previous is not None:
+        previous.close()
+    return pool
+
+
+def close_db_pool():
+    """
+    Close the module-level connection pool. The next query opens a fresh one.
+    """
+    global _db_pool
+    with _db_pool_lock:
+        previous, _db_pool = _db_pool, None
+    if previous is not None:
+        previous.close()
+
+
+def get_db_pool_stats():
+    """
+    Return hit/miss and wait-time counters of the module-level pool.
+
+    Returns:
+        stats (dict): See DBConnectionPool.stats()
+    """
+    return get_db_pool().stats()
+
+
+@contextmanager
+def db_connection():
+    """
+    Borrow a pooled connection for the duration of a with-block.
+
+    Yields:
+        connection (psycopg2.extensions.connection): Database connection object, or None if connecting failed
+    """
+    pool = get_db_pool()
+    connection = pool.acquire()
+    discard = False
+    try:
+        yield connection
+    except (OperationalError, InterfaceError):
+        discard = True
+        raise
+    finally:
+        pool.release(connection, discard=discard)
+
+
+# *****************************************
+# *                                       *
+# *  Query Result Cache                  *
+# *                                       *
+# *****************************************
+
+_CACHE_MISS = object()
+
+
+def _bare_table_name(table_name):
+    """
+    Normalise a table name the way PostgreSQL resolves unquoted identifiers.
+    """
+    return table_name.split(".")[-1].lower()
+
+
+class QueryResultCache:
+    """
+    LRU cache of query results with a TTL, an entry limit and a byte budget.
+
+    Entries are tagged with the table they were read from, so a change to that
+    table (reported through invalidate_table(), usually by a
+    TableChangeListener) drops every result that depends on it.
+
+    Args:
+        ttl (float): Seconds an entry stays valid
+        max_entries (int): Maximum number of cached results
+        max_bytes (int): Approximate memory budget for keys and values
+    """
+
+    def __init__(self, ttl=QUERY_CACHE_TTL, max_entries=QUERY_CACHE_MAX_ENTRIES, max_bytes=QUERY_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, table, expires_at, size)
+        self._generations = {}
+        self._epoch = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def generation(self, table_name):
+        """
+        Return the change counter of a table; take it before running a query and pass it to put().
+        """
+        with self._lock:
+            return self._epoch, self._generations.get(_bare_table_name(table_name), 0)
+
+    def get(self, key):
+        """
+        Look up a cached result.
+
+        Returns:
+            value: The cached result, or _CACHE_MISS
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self._stats["misses"] += 1
+                return _CACHE_MISS
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[0]
+
+    def put(self, key, table_name, value, generation):
+        """
+        Store a result unless the table changed since generation was taken.
+
+        Args:
+            key (tuple): Normalised query key
+            table_name (str): Table the result was read from
+            value: Query result
+            generation (tuple): Value of generation(table_name) before the query ran
+        """
+        table = _bare_table_name(table_name)
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if (self._epoch, self._generations.get(table, 0)) != generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, table, time.monotonic() + self.ttl, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def invalidate_table(self, table_name):
+        """
+        Drop every cached result read from a table.
+
+        Args:
+            table_name (str): Name of the changed table
+        """
+        table = _bare_table_name(table_name)
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            for key in [key for key, entry in self._entries.items() if entry[1] == table]:
+                self._remove(key)
+            self._stats["invalidations"] += 1
+
+    def clear(self):
+        """
+        Drop every cached result, e.g. after notifications may have been missed.
+        """
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Snapshot of the cache counters.
+
+        Returns:
+            stats (dict): hits, misses, evictions, invalidations, entries and bytes
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        return stats
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[3]
+
+
+class TableChangeListener(threading.Thread):
+    """
+    Background thread that LISTENs for table change notifications and invalidates the cache.
+
+    Notifications are sent by the trigger installed with install_table_change_trigger();
+    the payload is the name of the changed table. Whenever the listening
+    connection is (re)established the whole cache is cleared, because
+    notifications sent while it was down are lost.
+
+    Args:
+        cache (QueryResultCache): Cache to invalidate
+        channel (str): Notification channel
+        poll_interval (float): Seconds between checks of the stop flag
+    """
+
+    def __init__(self, cache, channel=TABLE_CHANGE_CHANNEL, poll_interval=TABLE_CHANGE_POLL_INTERVAL):
+        super().__init__(name="table-change-listener", daemon=True)
+        self.cache = cache
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """
+        Ask the listener to exit and wait for it.
+        """
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            connection = establish_db_connection()
+            if connection is None:
+                self._stop_event.wait(self.poll_interval)
+                continue
+            try:
+                connection.autocommit = True
+                connection.cursor().execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+                self.cache.clear()
+                while not self._stop_event.is_set():
+                    if select.select([connection], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        self.cache.invalidate_table(connection.notifies.pop(0).payload)
+            except Error as e:
+                print(DB_CONNECTION_ERROR, e)
+                self.cache.clear()
+            finally:
+                connection.close()
+
+
+_query_cache = None
+_table_change_listener = None
+
+
+def enable_query_cache(ttl=QUERY_CACHE_TTL, max_entries=QUERY_CACHE_MAX_ENTRIES,
+                       max_bytes=QUERY_CACHE_MAX_BYTES, listen=True):
+    """
+    Put a result cache in front of sum_of_values, calculate_age and aggregate_values.
+
+    Args:
+        ttl (float): Seconds an entry stays valid
+        max_entries (int): Maximum number of cached results
+        max_bytes (int): Approximate memory budget for cached results
+        listen (bool): Start a TableChangeListener for LISTEN/NOTIFY invalidation.
+            Without it, call invalidate_table() after writes or rely on the TTL.
+
+    Returns:
+        cache (QueryResultCache): The new cache
+    """
+    global _query_cache, _table_change_listener
+    disable_query_cache()
+    _query_cache = QueryResultCache(ttl, max_entries, max_bytes)
+    if listen:
+        _table_change_listener = TableChangeListener(_query_cache)
+        _table_change_listener.start()
+    return _query_cache
+
+
+def disable_query_cache():
+    """
+    Remove the result cache and stop its listener.
+    """
+    global _query_cache, _table_change_listener
+    if _table_change_listener is not None:
+        _table_change_listener.stop()
+    _query_cache = None
+    _table_change_listener = None
+
+
+def invalidate_table(table_name):
+    """
+    Drop cached results for a table, e.g. right after writing to it.
+
+    Args:
+        table_name (str): Name of the changed table
+    """
+    if _query_cache is not None:
+        _query_cache.invalidate_table(table_name)
+
+
+def install_table_change_trigger(table_name, channel=TABLE_CHANGE_CHANNEL):
+    """
+    Install the statement-level trigger that notifies the cache listener when a table changes.
+
+    Args:
+        table_name (str): Name of the table to watch
+        channel (str): Notification channel
+
+    Returns:
+        installed (bool): True if the trigger was created
+    """
+    trigger = sql.Identifier(f"{_bare_table_name(table_name)}_notify_change")
+    table = _identifier(table_name)
+    try:
+        with db_connection() as connection:
+            if connection:
+                cursor = connection.cursor()
+                cursor.execute(TABLE_CHANGE_FUNCTION_SQL)
+                cursor.execute(sql.SQL(DROP_TABLE_CHANGE_TRIGGER_SQL).format(trigger=trigger, table=table))
+                cursor.execute(sql.SQL(TABLE_CHANGE_TRIGGER_SQL).format(
+                    trigger=trigger, table=table, channel=sql.Literal(channel)))
+                connection.commit()
+                return True
+    except Error as e:
+        print(INVALID_TABLE_ERROR, e)
+    return False
+
+
+def _cached_query(key, table_name, run_query):
+    """
+    Return a cached result for key, or run the query and cache its non-None result.
+    """
+    cache = _query_cache
+    if cache is None:
+        return run_query()
+    value = cache.get(key)
+    if value is not _CACHE_MISS:
+        return value
+    generation = cache.generation(table_name)
+    value = run_query()
+    if value is not None:
+        cache.put(key, table_name, value, generation)
+    return value
+
+
+# *****************************************
+# *                                       *
+# *  Prepared Statements                 *
+# *                                       *
+# *****************************************
+
+# connection -> OrderedDict of query text -> statement name, in LRU order.
+# Entries vanish with the connection, so discarded pool connections need no cleanup.
+_prepared_statements = weakref.WeakKeyDictionary()
+_prepared_statements_lock = threading.Lock()
+_statement_ids = count()
+
+
+def _positional_placeholders(query):
+    """
+    Rewrite psycopg2 %s placeholders as the $1, $2, ... parameters PREPARE expects.
+    """
+    parts = query.split("%s")
+    prepared = parts[0]
+    for position, part in enumerate(parts[1:], start=1):
+        prepared += f"${position}{part}"
+    return prepared
+
+
+def execute_prepared(connection, cursor, query, params=()):
+    """
+    Execute a query template through a server-side prepared statement.
+
+    The first call on a connection runs PREPARE; later calls with the same
+    query text only run EXECUTE, skipping the parse/plan step. Each connection
+    keeps at most PREPARED_STATEMENT_CACHE_SIZE statements and deallocates the
+    least recently used one when the limit is exceeded.
+
+    Args:
+        connection (psycopg2.extensions.connection): Connection the cursor belongs to
+        cursor (psycopg2.extensions.cursor): Cursor to execute on
+        query (str): Query text using %s placeholders
+        params (tuple, optional): Query parameters. Defaults to ().
+    """
+    if PREPARED_STATEMENT_CACHE_SIZE <= 0:
+        cursor.execute(query, params)
+        return
+    with _prepared_statements_lock:
+        statements = _prepared_statements.setdefault(connection, OrderedDict())
+    name = statements.get(query)
+    if name is None:
+        name = f"stmt_{next(_statement_ids)}"
+        cursor.execute(sql.SQL("PREPARE {} AS ").format(sql.Identifier(name)) + sql.SQL(_positional_placeholders(query)))
+        statements[query] = name
+        if len(statements) > PREPARED_STATEMENT_CACHE_SIZE:
+            _, evicted = statements.popitem(last=False)
+            cursor.execute(sql.SQL("DEALLOCATE {}").format(sql.Identifier(evicted)))
+    else:
+        statements.move_to_end(query)
+    if params:
+        placeholders = sql.SQL(", ").join([sql.Placeholder()] * len(params))
+        cursor.execute(sql.SQL("EXECUTE {} ({})").format(sql.Identifier(name), placeholders), params)
+    else:
+        cursor.execute(sql.SQL("EXECUTE {}").format(sql.Identifier(name)))
+
+
 # *****************************************
 # *                                       *
 # *  PostgreSQL Function 1: Sum of Values *
 # *                                       *
 # *****************************************
 
-def sum_of_values(table_name, column_name):
+def sum_of_values(table_name, column_name, incremental=False):
     """
     Calculate the sum of a group of values in a specified column.
 
     Args:
         table_name (str): Name of the table
         column_name (str): Name of the column
+        incremental (bool, optional): Read the trigger-maintained total set up by
+            install_running_total() instead of scanning the table; falls back to a
+            full scan if none is installed for this column, or if the running_totals
+            table does not exist yet. Defaults to False.
 
     Returns:
         sum_of_values (float): Sum of the values in the specified column
     """
+    key = ("sum_of_values", table_name.lower(), column_name.lower())
+    return _cached_query(key, table_name, lambda: _query_sum_of_values(table_name, column_name, incremental))
+
+
+def _query_sum_of_values(table_name, column_name, incremental=False):
     try:
-        connection = establish_db_connection()
-        if connection:
-            cursor = connection.cursor()
-            query = SUM_VALUES_QUERY.format(column_name=column_name, table_name=table_name)
-            cursor.execute(query)
-            sum_of_values = cursor.fetchone()[0]
-            connection.close()
-            return sum_of_values
+        with db_connection() as connection:
+            if connection:
+                cursor = connection.cursor()
+                if incremental:
+                    execute_prepared(connection, cursor, RUNNING_TOTALS_EXISTS_QUERY, (RUNNING_TOTALS_TABLE,))
+                    running_total = None
+                    if cursor.fetchone()[0] is not None:
+                        params = (table_name.lower(), column_name.lower())
+                        with QueryTimer("sum_of_values_incremental", connection, RUNNING_TOTAL_QUERY, params) as timer:
+                            execute_prepared(connection, cursor, RUNNING_TOTAL_QUERY, params)
+                            timer.executed()
+                            running_total = timer.fetch_one(cursor)
+                    if running_total is not None:
+                        total, value_count = running_total
+                        return total if value_count else None
+                query = SUM_VALUES_QUERY.format(column_name=column_name, table_name=table_name)
+                with QueryTimer("sum_of_values", connection, query) as timer:
+                    execute_prepared(connection, cursor, query)
+                    timer.executed()
+                    sum_of_values = timer.fetch_one(cursor)[0]
+                return sum_of_values
     except Error as e:
         print(INVALID_TABLE_ERROR if "relation" in str(e) else INVALID_COLUMN_ERROR, e)
         return None
 
 
+def _running_total_names(table_name, column_name):
+    table_key, column_key = table_name.lower(), column_name.lower()
+    prefix = f"{_bare_table_name(table_name)}_{column_key}_running_total"
+    return {
+        "table": _identifier(table_name),
+        "column": sql.Identifier(column_name),
+        "table_key": sql.Literal(table_key),
+        "column_key": sql.Literal(column_key),
+        "function": sql.Identifier(prefix),
+    }, prefix
+
+
+def install_running_total(table_name, column_name):
+    """
+    Maintain SUM(column_name) of a table incrementally for sum_of_values(..., incremental=True).
+
+    Statement-level triggers with transition tables apply only the delta of
+    each INSERT, UPDATE, DELETE or TRUNCATE to a row in the running_totals
+    summary table, so reads are constant-time and stay exact. The table is
+    locked against writes while the triggers are created and the initial
+    total is computed. Every writing transaction updates the same summary
+    row, which serialises concurrent writers on it until they commit.
+
+    Args:
+        table_name (str): Name of the table
+        column_name (str): Name of the numeric column
+
+    Returns:
+        installed (bool): True if the running total was set up
+    """
+    names, prefix = _running_total_names(table_name, column_name)
+    try:
+        with db_connection() as connection:
+            if connection:
+                cursor = connection.cursor()
+                cursor.execute(CREATE_RUNNING_TOTALS_TABLE_SQL)
+                cursor.execute(sql.SQL("LOCK TABLE {} IN SHARE ROW EXCLUSIVE MODE").format(names["table"]))
+                cursor.execute(sql.SQL(RUNNING_TOTAL_FUNCTION_SQL).format(**names))
+                for event, definition in RUNNING_TOTAL_TRIGGERS_SQL:
+                    trigger = sql.Identifier(f"{prefix}_{event}")
+                    cursor.execute(sql.SQL(DROP_TABLE_CHANGE_TRIGGER_SQL).format(trigger=trigger, table=names["table"]))
+                    cursor.execute(
+                        sql.SQL("CREATE TRIGGER {} ").format(trigger)
+                        + sql.SQL(definition).format(table=names["table"])
+                        + sql.SQL(" EXECUTE FUNCTION {}()").format(names["function"])
+                    )
+                cursor.execute(sql.SQL(INITIALISE_RUNNING_TOTAL_SQL).format(**names))
+                connection.commit()
+                return True
+    except Error as e:
+        print(INVALID_TABLE_ERROR if "relation" in str(e) else INVALID_COLUMN_ERROR, e)
+    return False
+
+
+def drop_running_total(table_name, column_name):
+    """
+    Remove the triggers and summary row created by install_running_total().
+
+    Args:
+        table_name (str): Name of the table
+        column_name (str): Name of the column
+
+    Returns:
+        dropped (bool): True if the running total was removed
+    """
+    names, prefix = _running_total_names(table_name, column_name)
+    try:
+        with db_connection() as connection:
+            if connection:
+                cursor = connection.cursor()
+                for event, _ in RUNNING_TOTAL_TRIGGERS_SQL:
+                    trigger = sql.Identifier(f"{prefix}_{event}")
+                    cursor.execute(sql.SQL(DROP_TABLE_CHANGE_TRIGGER_SQL).format(trigger=trigger, table=names["table"]))
+                cursor.execute(sql.SQL("DROP FUNCTION IF EXISTS {}()").format(names["function"]))
+                cursor.execute(
+                    sql.SQL("DELETE FROM running_totals WHERE table_name = {table_key} AND column_name = {column_key}")
+                    .format(**names)
+                )
+                connection.commit()
+                return True
+    except Error as e:
+        print(INVALID_TABLE_ERROR if "relation" in str(e) else INVALID_COLUMN_ERROR, e)
+    return False
+
+
 # *****************************************
 # *                                       *
 # *  PostgreSQL Function 2: Calculate Age *
 # *                                       *
 # *****************************************
 
+def calculate_ages(table_name, birthdate_column, person_ids, chunk_size=AGE_BATCH_SIZE):
+    """
+    Calculate the ages of many people with one query per chunk of IDs.
+
+    The IDs are sent as an array parameter (WHERE id = ANY(%s)), so a chunk
+    costs a single round-trip instead of one per person. Results are fetched
+    chunk by chunk and yielded as they arrive; IDs with no matching row are
+    skipped and the order of the pairs is not guaranteed. IDs are converted
+    with int() first, so numeric strings such as "1" work as they did with
+    the inlined single-ID query; the array parameter is typed integer[].
+
+    Args:
+        table_name (str): Name of the table
+        birthdate_column (str): Name of the birthdate column
+        person_ids (iterable of int or str): IDs of the people
+        chunk_size (int, optional): IDs per query and rows per fetch. Defaults to AGE_BATCH_SIZE.
+
+    Yields:
+        (person_id, age) (tuple): ID of the person and their age as a string
+    """
+    query = CALCULATE_AGES_QUERY.format(table_name=table_name, birthdate_column=birthdate_column)
+    ids = iter(person_ids)
+    try:
+        with db_connection() as connection:
+            if connection:
+                cursor = connection.cursor()
+                chunk = [int(person_id) for person_id in islice(ids, chunk_size)]
+                while chunk:
+                    with QueryTimer("calculate_ages", connection, query, (chunk,)) as timer:
+                        execute_prepared(connection, cursor, query, (chunk,))
+                        timer.executed()
+                        rows = timer.fetch_rows(cursor.fetchmany, chunk_size)
+                        while rows:
+                            for person_id, age in rows:
+                                yield person_id, str(age)
+                            rows = timer.fetch_rows(cursor.fetchmany, chunk_size)
+                    chunk = [int(person_id) for person_id in islice(ids, chunk_size)]
+    except (TypeError, ValueError) as e:
+        print(INVALID_PERSON_ID_ERROR, e)
+    except Error as e:
+        print(INVALID_TABLE_ERROR if "relation" in str(e) else INVALID_COLUMN_ERROR, e)
+
+
 def calculate_age(table_name, birthdate_column, person_id):
     """
     Calculate the age of a person based on their birthdate.
@@ -97,25 +1232,300 @@ def calculate_age(table_name, birthdate_column, person_id):
     Args:
         table_name (str): Name of the table
         birthdate_column (str): Name of the birthdate column
-        person_id (int): ID of the person
+        person_id (int or str): ID of the person
 
     Returns:
         age (str): Age of the person
     """
+    key = ("calculate_age", table_name.lower(), birthdate_column.lower(), person_id)
+    return _cached_query(key, table_name, lambda: _query_age(table_name, birthdate_column, person_id))
+
+
+def _query_age(table_name, birthdate_column, person_id):
+    ages = list(calculate_ages(table_name, birthdate_column, [person_id]))
+    return ages[0][1] if ages else None
+
+
+# *****************************************
+# *                                       *
+# *  PostgreSQL Function 3: Aggregates   *
+# *                                       *
+# *****************************************
+
+def _identifier(name):
+    """
+    Quote a possibly schema-qualified name ("schema.table") as an SQL identifier.
+    """
+    return sql.Identifier(*name.split("."))
+
+
+def build_aggregate_query(table_name, aggregates, group_by=None, where=None):
+    """
+    Compile several aggregates into one parameterised SELECT statement.
+
+    Args:
+        table_name (str): Name of the table
+        aggregates (list of tuple): (function, column) pairs, e.g. [("SUM", "salary"), ("COUNT", "*")]
+        group_by (list of str, optional): Columns to group by. Defaults to None.
+        where (list of tuple, optional): (column, operator, value) conditions joined with AND.
+            "IN" takes a list of values. Defaults to None.
+
+    Returns:
+        (query, params) (tuple): psycopg2.sql.Composed statement and its parameter list
+
+    Raises:
+        ValueError: If no aggregates are given or a function or operator is not supported
+    """
+    if not aggregates:
+        raise ValueError(f"{INVALID_AGGREGATE_ERROR}: no aggregates requested")
+    group_columns = [_identifier(column) for column in group_by or []]
+
+    select_list = list(group_columns)
+    for function, column in aggregates:
+        function = function.upper()
+        if function not in AGGREGATE_FUNCTIONS:
+            raise ValueError(f"{INVALID_AGGREGATE_ERROR}: {function}")
+        target = sql.SQL("*") if column == "*" and function == "COUNT" else _identifier(column)
+        select_list.append(sql.SQL("{}({})").format(sql.SQL(function), target))
+
+    query = sql.SQL("SELECT {} FROM {}").format(sql.SQL(", ").join(select_list), _identifier(table_name))
+    params = []
+    if where:
+        conditions = []
+        for column, operator, value in where:
+            operator = operator.upper()
+            if operator not in WHERE_OPERATORS:
+                raise ValueError(f"{INVALID_OPERATOR_ERROR}: {operator}")
+            if operator == "IN":
+                conditions.append(sql.SQL("{} = ANY(%s)").format(_identifier(column)))
+                value = list(value)
+            else:
+                conditions.append(sql.SQL("{} {} %s").format(_identifier(column), sql.SQL(operator)))
+            params.append(value)
+        query += sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions)
+    if group_columns:
+        query += sql.SQL(" GROUP BY ") + sql.SQL(", ").join(group_columns)
+    return query, params
+
+
+def aggregate_values(table_name, aggregates, group_by=None, where=None):
+    """
+    Compute several aggregates over a table with a single scan.
+
+    Args:
+        table_name (str): Name of the table
+        aggregates (list of tuple): (function, column) pairs, e.g. [("SUM", "salary"), ("AVG", "salary")]
+        group_by (list of str, optional): Columns to group by. Defaults to None.
+        where (list of tuple, optional): (column, operator, value) filter conditions. Defaults to None.
+
+    Returns:
+        rows (list of tuple): One row per group; group-by values first, then the
+            aggregates in the requested order. Without group_by there is exactly one row.
+    """
+    query, params = build_aggregate_query(table_name, aggregates, group_by, where)
+    key = ("aggregate_values", table_name.lower(), repr(query), repr(params))
+    return _cached_query(key, table_name, lambda: _query_aggregate_values(query, params))
+
+
+def _query_aggregate_values(query, params):
     try:
-        connection = establish_db_connection()
-        if connection:
-            cursor = connection.cursor()
-            query = CALCULATE_AGE_QUERY.format(table_name=table_name, birthdate_column=birthdate_column, person_id=person_id)
-            cursor.execute(query)
-            age = cursor.fetchone()[0]
-            connection.close()
-            return str(age)
+        with db_connection() as connection:
+            if connection:
+                cursor = connection.cursor()
+                with QueryTimer("aggregate_values", connection, query, params) as timer:
+                    cursor.execute(query, params)
+                    timer.executed()
+                    return timer.fetch_rows(cursor.fetchall)
     except Error as e:
         print(INVALID_TABLE_ERROR if "relation" in str(e) else INVALID_COLUMN_ERROR, e)
         return None
 
 
+# *****************************************
+# *                                       *
+# *  PostgreSQL Function 4: Streaming    *
+# *                                       *
+# *****************************************
+
+_stream_cursor_ids = count()
+
+
+def stream_query(query, params=None, itersize=STREAM_ITERSIZE, chunked=False, as_numpy=False):
+    """
+    Stream the result of a query through a named (server-side) cursor.
+
+    Only itersize rows are held in client memory at a time, so memory stays
+    flat regardless of the size of the result. The pooled connection stays
+    checked out until the generator is exhausted or closed.
+
+    Args:
+        query (str or psycopg2.sql.Composable): Query to run
+        params (tuple or list, optional): Query parameters. Defaults to None.
+        itersize (int, optional): Rows fetched per round-trip. Defaults to STREAM_ITERSIZE.
+        chunked (bool, optional): Yield column chunks instead of rows. Defaults to False.
+        as_numpy (bool, optional): Build a NumPy array per column of each chunk (implies chunked). Defaults to False.
+
+    Yields:
+        row (tuple): One result row, or when chunked, a list with one sequence
+            (list or numpy.ndarray) per column covering up to itersize rows
+    """
+    if as_numpy:
+        import numpy as np
+        chunked = True
+    try:
+        with db_connection() as connection:
+            if connection:
+                cursor = connection.cursor(name=f"stream_{next(_stream_cursor_ids)}")
+                cursor.itersize = itersize
+                try:
+                    with QueryTimer("stream_query", connection, query, params) as timer:
+                        cursor.execute(query, params)
+                        timer.executed()
+                        if not chunked:
+                            rows = iter(cursor)
+                            row = timer.fetch_next(rows)
+                            while row is not None:
+                                yield row
+                                row = timer.fetch_next(rows)
+                        else:
+                            rows = timer.fetch_rows(cursor.fetchmany, itersize)
+                            while rows:
+                                columns = zip(*rows)
+                                if as_numpy:
+                                    yield [np.asarray(column) for column in columns]
+                                else:
+                                    yield [list(column) for column in columns]
+                                rows = timer.fetch_rows(cursor.fetchmany, itersize)
+                finally:
+                    cursor.close()
+    except Error as e:
+        print(INVALID_TABLE_ERROR if "relation" in str(e) else INVALID_COLUMN_ERROR, e)
+
+
+def stream_ages(table_name, birthdate_column, itersize=STREAM_ITERSIZE):
+    """
+    Calculate the age of every person in a table without loading the table into memory.
+
+    Args:
+        table_name (str): Name of the table
+        birthdate_column (str): Name of the birthdate column
+        itersize (int, optional): Rows fetched per round-trip. Defaults to STREAM_ITERSIZE.
+
+    Yields:
+        (person_id, age) (tuple): ID of the person and their age as a string
+    """
+    query = STREAM_AGES_QUERY.format(table_name=table_name, birthdate_column=birthdate_column)
+    for person_id, age in stream_query(query, itersize=itersize):
+        yield person_id, str(age)
+
+
+# *****************************************
+# *                                       *
+# *  Async (asyncio) Helpers             *
+# *                                       *
+# *****************************************
+
+# psycopg2 has no asyncio driver, so the async helpers hand the blocking calls
+# to a dedicated thread pool sized to the connection pool. The event loop is
+# never blocked and up to ASYNC_MAX_WORKERS queries run concurrently, each on
+# its own pooled connection.
+
+_async_executor = None
+_async_executor_lock = threading.Lock()
+
+
+def _get_async_executor():
+    global _async_executor
+    with _async_executor_lock:
+        if _async_executor is None:
+            _async_executor = ThreadPoolExecutor(max_workers=ASYNC_MAX_WORKERS, thread_name_prefix="db-async")
+        return _async_executor
+
+
+def close_async_executor():
+    """
+    Shut down the worker threads used by the async helpers.
+    """
+    global _async_executor
+    with _async_executor_lock:
+        executor, _async_executor = _async_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+async def _run_async(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_async_executor(), partial(func, *args, **kwargs))
+
+
+async def async_establish_db_connection():
+    """
+    Establish a connection to the PostgreSQL database without blocking the event loop.
+
+    Returns:
+        connection (psycopg2.extensions.connection): Database connection object
+    """
+    return await _run_async(establish_db_connection)
+
+
+async def async_sum_of_values(table_name, column_name):
+    """
+    Async version of sum_of_values().
+
+    Args:
+        table_name (str): Name of the table
+        column_name (str): Name of the column
+
+    Returns:
+        sum_of_values (float): Sum of the values in the specified column
+    """
+    return await _run_async(sum_of_values, table_name, column_name)
+
+
+async def async_calculate_age(table_name, birthdate_column, person_id):
+    """
+    Async version of calculate_age().
+
+    Args:
+        table_name (str): Name of the table
+        birthdate_column (str): Name of the birthdate column
+        person_id (int or str): ID of the person
+
+    Returns:
+        age (str): Age of the person
+    """
+    return await _run_async(calculate_age, table_name, birthdate_column, person_id)
+
+
+async def async_aggregate_values(table_name, aggregates, group_by=None, where=None):
+    """
+    Async version of aggregate_values().
+
+    Args:
+        table_name (str): Name of the table
+        aggregates (list of tuple): (function, column) pairs
+        group_by (list of str, optional): Columns to group by. Defaults to None.
+        where (list of tuple, optional): (column, operator, value) filter conditions. Defaults to None.
+
+    Returns:
+        rows (list of tuple): See aggregate_values()
+    """
+    return await _run_async(aggregate_values, table_name, aggregates, group_by, where)
+
+
+async def gather_aggregates(requests):
+    """
+    Run several independent aggregate requests concurrently on separate pooled connections.
+
+    Args:
+        requests (iterable of tuple): (table_name, aggregates[, group_by[, where]]) argument tuples
+
+    Returns:
+        results (list): aggregate_values() result for each request, in order
+    """
+    return await asyncio.gather(*(async_aggregate_values(*request) for request in requests))
+
+
 # *****************************************
 # *                                       *
 # *  Example Usage                       *
@@ -133,5 +1543,14 @@ if __name__ == "__main__":
     age_result = calculate_age(table_name, birthdate_column, person_id)
     print(f"Age of person with ID {person_id} in {table_name}: {age_result}")
 
+    salary_stats = aggregate_values(
+        table_name,
+        [("SUM", column_name), ("AVG", column_name), ("MIN", column_name), ("MAX", column_name), ("COUNT", "*")],
+    )
+    print(f"Salary statistics for {table_name}: {salary_stats}")
+
+    print(f"Connection pool stats: {get_db_pool_stats()}")
+    close_db_pool()
+
 
 #*End of AI Generated Content*
\ No newline at end of file
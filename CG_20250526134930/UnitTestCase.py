@@ -9,19 +9,53 @@ python
 # *****************************************
 
 python
+import threading
 import unittest
 from unittest.mock import patch, MagicMock
 from your_module import (  # Replace 'your_module' with the actual module name
     establish_db_connection,
     sum_of_values,
     calculate_age,
+    calculate_ages,
+    aggregate_values,
+    build_aggregate_query,
+    stream_query,
+    stream_ages,
+    async_sum_of_values,
+    async_calculate_age,
+    gather_aggregates,
+    execute_prepared,
+    get_query_metrics,
+    export_query_metrics,
+    reset_query_metrics,
+    install_running_total,
+    DBConnectionPool,
+    configure_db_pool,
+    close_db_pool,
+    get_db_pool_stats,
+    db_connection,
+    QueryResultCache,
+    enable_query_cache,
+    disable_query_cache,
+    invalidate_table,
     DB_HOST, DB_NAME, DB_USER, DB_PASSWORD,
     DB_CONNECTION_ERROR, INVALID_TABLE_ERROR, INVALID_COLUMN_ERROR
 )
+from psycopg2 import OperationalError
+from psycopg2.pool import PoolError
 
 
 class TestPostgreSQLDBFunctions(unittest.TestCase):
 
+    def setUp(self):
+        # Every test starts from an empty pool so patched connections are picked up
+        close_db_pool()
+        disable_query_cache()
+
+    def tearDown(self):
+        close_db_pool()
+        disable_query_cache()
+
     # *****************************************
     # *                                       *
     # *  Test Database Connection            *
@@ -137,10 +171,70 @@ class TestPostgreSQLDBFunctions(unittest.TestCase):
         mock_age = '30 years'  # Example age string
         with patch('psycopg2.connect') as mock_connect:
             mock_connection = MagicMock()
-            mock_connection.cursor().fetchone.return_value = [mock_age]
+            mock_connection.cursor().fetchmany.side_effect = [[(person_id, mock_age)], []]
             mock_connect.return_value = mock_connection
             result = calculate_age(table_name, birthdate_column, person_id)
             self.assertEqual(result, mock_age)
+            prepare, execute = mock_connection.cursor().execute.call_args_list
+            self.assertIn("SELECT id, AGE(birthdate) FROM employees WHERE id = ANY($1)", repr(prepare.args[0]))
+            self.assertEqual(execute.args[1], ([person_id],))
+
+    def test_calculate_age_missing_person(self):
+        """
+        Test calculate age for an ID with no matching row.
+
+        Verifies:
+            - None is returned.
+        """
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connection = MagicMock()
+            mock_connection.cursor().fetchmany.return_value = []
+            mock_connect.return_value = mock_connection
+            self.assertIsNone(calculate_age('employees', 'birthdate', 42))
+
+    def test_calculate_ages_batches_ids(self):
+        """
+        Test batched age calculation.
+
+        Verifies:
+            - IDs are sent as array parameters, one query per chunk.
+            - (id, age) pairs from every chunk are yielded as strings.
+        """
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connection = MagicMock()
+            mock_cursor = mock_connection.cursor()
+            mock_cursor.fetchmany.side_effect = [
+                [(1, '30 years'), (2, '41 years')], [],
+                [(3, '25 years')], [],
+            ]
+            mock_connect.return_value = mock_connection
+            result = list(calculate_ages('employees', 'birthdate', iter([1, 2, 3]), chunk_size=2))
+            self.assertEqual(result, [(1, '30 years'), (2, '41 years'), (3, '25 years')])
+            executes = mock_cursor.execute.call_args_list[1:]
+            self.assertEqual([call.args[1] for call in executes], [([1, 2],), ([3],)])
+
+    def test_calculate_age_string_id(self):
+        """
+        Test calculate age with an ID given as a string.
+
+        Verifies:
+            - Numeric string IDs are bound as integers.
+            - Non-numeric IDs print an error and return None without querying.
+        """
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connection = MagicMock()
+            mock_cursor = mock_connection.cursor()
+            mock_cursor.fetchmany.side_effect = [[(1, '30 years')], []]
+            mock_connect.return_value = mock_connection
+            self.assertEqual(calculate_age('employees', 'birthdate', "1"), '30 years')
+            self.assertEqual(mock_cursor.execute.call_args_list[-1].args[1], ([1],))
+
+            mock_cursor.execute.reset_mock()
+            with patch('builtins.print') as mock_print:
+                self.assertIsNone(calculate_age('employees', 'birthdate', "abc"))
+            mock_print.assert_called_once()
+            self.assertEqual(mock_print.call_args.args[0], "Invalid person ID")
+            mock_cursor.execute.assert_not_called()
 
     def test_calculate_age_invalid_table(self):
         """
@@ -182,6 +276,482 @@ class TestPostgreSQLDBFunctions(unittest.TestCase):
                 self.assertIsNone(result)
                 mock_print.assert_called_once_with(INVALID_COLUMN_ERROR, mock_connection.cursor().execute.side_effect)
 
+    # *****************************************
+    # *                                       *
+    # *  Test Connection Pool                *
+    # *                                       *
+    # *****************************************
+
+    def test_pool_reuses_connections(self):
+        """
+        Test that repeated queries share one pooled connection.
+
+        Verifies:
+            - psycopg2.connect is called only once for several queries.
+            - The connection is returned to the pool rather than closed.
+            - Hits are counted in the pool stats.
+        """
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connection = MagicMock()
+            mock_connection.closed = 0
+            mock_connection.cursor().fetchone.return_value = [1000.0]
+            mock_connection.cursor().fetchmany.return_value = []
+            mock_connect.return_value = mock_connection
+            sum_of_values('employees', 'salary')
+            sum_of_values('employees', 'salary')
+            calculate_age('employees', 'birthdate', 1)
+            self.assertEqual(mock_connect.call_count, 1)
+            mock_connection.close.assert_not_called()
+            stats = get_db_pool_stats()
+            self.assertEqual(stats["hits"], 3)
+            self.assertEqual(stats["size"], 1)
+
+    def test_pool_discards_closed_connection(self):
+        """
+        Test the health check on checkout.
+
+        Verifies:
+            - A pooled connection that has been closed is replaced by a new one.
+        """
+        with patch('psycopg2.connect') as mock_connect:
+            stale, fresh = MagicMock(), MagicMock()
+            stale.closed = 1
+            fresh.closed = 0
+            mock_connect.side_effect = [stale, fresh]
+            configure_db_pool(min_size=1, max_size=1)
+            with db_connection() as connection:
+                self.assertIs(connection, fresh)
+            self.assertEqual(get_db_pool_stats()["discarded"], 1)
+
+    def test_pool_discards_connection_after_operational_error(self):
+        """
+        Test that connection-level errors do not poison the pool.
+
+        Verifies:
+            - The connection is closed and the pool shrinks.
+        """
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connection = MagicMock()
+            mock_connect.return_value = mock_connection
+            configure_db_pool(min_size=0, max_size=1)
+            with self.assertRaises(OperationalError):
+                with db_connection():
+                    raise OperationalError("server closed the connection unexpectedly")
+            mock_connection.close.assert_called_once()
+            self.assertEqual(get_db_pool_stats()["size"], 0)
+
+    def test_pool_exhausted_timeout(self):
+        """
+        Test checkout when every connection is in use.
+
+        Verifies:
+            - PoolError is raised once the timeout expires.
+            - The wait is recorded in the pool stats.
+        """
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connect.return_value = MagicMock()
+            pool = DBConnectionPool(min_size=0, max_size=1, timeout=0.05)
+            connection = pool.acquire()
+            with self.assertRaises(PoolError):
+                pool.acquire()
+            pool.release(connection)
+            stats = pool.stats()
+            self.assertEqual(stats["misses"], 1)
+            self.assertEqual(stats["waits"], 1)
+            self.assertGreater(stats["wait_time"], 0.0)
+            pool.close()
+
+
+    # *****************************************
+    # *                                       *
+    # *  Test Aggregate Values Function      *
+    # *                                       *
+    # *****************************************
+
+    def test_build_aggregate_query(self):
+        """
+        Test compilation of an aggregate request.
+
+        Verifies:
+            - Identifiers are quoted and filter values are passed as parameters.
+        """
+        query, params = build_aggregate_query(
+            'employees',
+            [('sum', 'salary'), ('COUNT', '*')],
+            group_by=['department'],
+            where=[('hired', '>=', '2020-01-01'), ('id', 'in', (1, 2))],
+        )
+        self.assertEqual(params, ['2020-01-01', [1, 2]])
+        for identifier in ("Identifier('employees')", "Identifier('salary')", "Identifier('department')"):
+            self.assertIn(identifier, repr(query))
+
+    def test_build_aggregate_query_rejects_unknown_function(self):
+        """
+        Test aggregate compilation with an unsupported function or operator.
+
+        Verifies:
+            - ValueError is raised before any query is sent.
+        """
+        with self.assertRaises(ValueError):
+            build_aggregate_query('employees', [('MEDIAN', 'salary')])
+        with self.assertRaises(ValueError):
+            build_aggregate_query('employees', [('SUM', 'salary')], where=[('id', 'LIKE', '1')])
+
+    def test_aggregate_values_single_scan(self):
+        """
+        Test aggregate values with several metrics.
+
+        Verifies:
+            - All metrics are computed by a single query.
+            - Rows are returned as fetched.
+        """
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connection = MagicMock()
+            mock_connection.cursor().fetchall.return_value = [(1000.0, 250.0, 4)]
+            mock_connect.return_value = mock_connection
+            result = aggregate_values('employees', [('SUM', 'salary'), ('AVG', 'salary'), ('COUNT', '*')])
+            self.assertEqual(result, [(1000.0, 250.0, 4)])
+            mock_connection.cursor().execute.assert_called_once()
+
+
+    # *****************************************
+    # *                                       *
+    # *  Test Query Result Cache             *
+    # *                                       *
+    # *****************************************
+
+    def test_query_cache_serves_repeated_reads(self):
+        """
+        Test that repeated sums are served from the cache until the table changes.
+
+        Verifies:
+            - The second call does not reach the database.
+            - invalidate_table() forces a fresh query.
+        """
+        enable_query_cache(listen=False)
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connection = MagicMock()
+            mock_cursor = mock_connection.cursor()
+            mock_cursor.fetchone.side_effect = [[1000.0], [1500.0]]
+            mock_connect.return_value = mock_connection
+            self.assertEqual(sum_of_values('employees', 'salary'), 1000.0)
+            self.assertEqual(sum_of_values('Employees', 'SALARY'), 1000.0)
+            self.assertEqual(mock_cursor.fetchone.call_count, 1)
+            invalidate_table('employees')
+            self.assertEqual(sum_of_values('employees', 'salary'), 1500.0)
+            self.assertEqual(mock_cursor.fetchone.call_count, 2)
+
+    def test_query_cache_ttl_and_lru(self):
+        """
+        Test cache expiry and eviction.
+
+        Verifies:
+            - Entries expire after the TTL.
+            - The least recently used entry is evicted when the cache is full.
+        """
+        cache = QueryResultCache(ttl=60.0, max_entries=2)
+        cache.put('a', 'employees', 1, cache.generation('employees'))
+        cache.put('b', 'employees', 2, cache.generation('employees'))
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 'employees', 3, cache.generation('employees'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["entries"], 2)
+
+        expired = QueryResultCache(ttl=0.0)
+        expired.put('a', 'employees', 1, expired.generation('employees'))
+        self.assertEqual(expired.stats()["entries"], 1)
+        self.assertNotEqual(expired.get('a'), 1)
+
+    def test_query_cache_skips_results_raced_by_invalidation(self):
+        """
+        Test that a result read before a table change is not cached after it.
+
+        Verifies:
+            - put() ignores results whose table generation is out of date.
+        """
+        cache = QueryResultCache()
+        generation = cache.generation('employees')
+        cache.invalidate_table('employees')
+        cache.put('a', 'employees', 1, generation)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+
+    # *****************************************
+    # *                                       *
+    # *  Test Streaming Queries              *
+    # *                                       *
+    # *****************************************
+
+    def test_stream_ages_uses_named_cursor(self):
+        """
+        Test row streaming through a server-side cursor.
+
+        Verifies:
+            - A named cursor with the requested itersize is used.
+            - Rows are yielded one by one and the cursor is closed afterwards.
+        """
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connection = MagicMock()
+            mock_cursor = mock_connection.cursor.return_value
+            mock_cursor.__iter__.return_value = iter([(1, '30 years'), (2, '41 years')])
+            mock_connect.return_value = mock_connection
+            result = list(stream_ages('employees', 'birthdate', itersize=500))
+            self.assertEqual(result, [(1, '30 years'), (2, '41 years')])
+            self.assertIn('name', mock_connection.cursor.call_args.kwargs)
+            self.assertEqual(mock_cursor.itersize, 500)
+            mock_cursor.close.assert_called_once()
+
+    def test_stream_query_numpy_chunks(self):
+        """
+        Test column-chunk streaming.
+
+        Verifies:
+            - Each fetched chunk is yielded as one NumPy array per column.
+        """
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connection = MagicMock()
+            mock_cursor = mock_connection.cursor.return_value
+            mock_cursor.fetchmany.side_effect = [[(1, 10.0), (2, 20.0)], [(3, 30.0)], []]
+            mock_connect.return_value = mock_connection
+            chunks = list(stream_query("SELECT id, salary FROM employees", itersize=2, as_numpy=True))
+            self.assertEqual(len(chunks), 2)
+            self.assertEqual(chunks[0][0].tolist(), [1, 2])
+            self.assertEqual(chunks[1][1].tolist(), [30.0])
+
+
+    # *****************************************
+    # *                                       *
+    # *  Test Prepared Statements            *
+    # *                                       *
+    # *****************************************
+
+    def test_execute_prepared_prepares_once_per_connection(self):
+        """
+        Test the per-connection prepared statement cache.
+
+        Verifies:
+            - PREPARE runs only on first use; later calls only EXECUTE.
+            - Parameters are passed separately from the statement text.
+        """
+        connection = MagicMock()
+        cursor = connection.cursor()
+        query = "SELECT id, AGE(birthdate) FROM employees WHERE id = ANY(%s)"
+        execute_prepared(connection, cursor, query, ([1],))
+        execute_prepared(connection, cursor, query, ([2],))
+        statements = [repr(call.args[0]) for call in cursor.execute.call_args_list]
+        self.assertEqual(sum("PREPARE" in statement for statement in statements), 1)
+        self.assertEqual(sum("EXECUTE" in statement for statement in statements), 2)
+        self.assertEqual(cursor.execute.call_args_list[-1].args[1], ([2],))
+
+    def test_execute_prepared_evicts_least_recently_used(self):
+        """
+        Test the bound on the per-connection statement cache.
+
+        Verifies:
+            - The least recently used statement is deallocated once the limit is exceeded.
+        """
+        connection = MagicMock()
+        cursor = connection.cursor()
+        with patch('your_module.PREPARED_STATEMENT_CACHE_SIZE', 2):
+            for column in ('a', 'b', 'c'):
+                execute_prepared(connection, cursor, f"SELECT SUM({column}) FROM employees")
+        statements = [repr(call.args[0]) for call in cursor.execute.call_args_list]
+        self.assertEqual(sum("DEALLOCATE" in statement for statement in statements), 1)
+
+
+    # *****************************************
+    # *                                       *
+    # *  Test Query Instrumentation          *
+    # *                                       *
+    # *****************************************
+
+    def test_query_metrics_recorded(self):
+        """
+        Test connect and per-template query timings.
+
+        Verifies:
+            - Connect time and execute/fetch/row histograms are recorded.
+            - The metrics are exported in the Prometheus text format.
+        """
+        reset_query_metrics()
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connection = MagicMock()
+            mock_connection.closed = 0
+            mock_connection.cursor().fetchmany.side_effect = [[(1, '30 years'), (2, '41 years')], []]
+            mock_connect.return_value = mock_connection
+            list(calculate_ages('employees', 'birthdate', [1, 2]))
+        metrics = get_query_metrics()
+        self.assertEqual(metrics["connect_seconds"]["count"], 1)
+        ages = metrics["queries"]["calculate_ages"]
+        self.assertEqual(ages["execute_seconds"]["count"], 1)
+        self.assertEqual(ages["rows"]["sum"], 2)
+        exported = export_query_metrics()
+        self.assertIn('db_query_rows_count{template="calculate_ages"} 1', exported)
+        self.assertIn('db_connect_seconds_bucket{le="+Inf"} 1', exported)
+
+    def test_slow_query_captures_explain_plan(self):
+        """
+        Test slow-query capture.
+
+        Verifies:
+            - Queries above the threshold are logged with their EXPLAIN (ANALYZE, BUFFERS) plan.
+        """
+        reset_query_metrics()
+        with patch('psycopg2.connect') as mock_connect, \
+                patch('your_module.SLOW_QUERY_THRESHOLD', 0.0), \
+                patch('your_module.EXPLAIN_SLOW_QUERIES', True):
+            mock_connection = MagicMock()
+            mock_connection.cursor().fetchone.return_value = [1000.0]
+            mock_connection.cursor().fetchall.return_value = [("Seq Scan on employees",)]
+            mock_connect.return_value = mock_connection
+            with self.assertLogs(level="WARNING"):
+                sum_of_values('employees', 'salary')
+        slow_queries = get_query_metrics()["slow_queries"]
+        self.assertEqual(len(slow_queries), 1)
+        self.assertEqual(slow_queries[0]["template"], "sum_of_values")
+        self.assertEqual(slow_queries[0]["plan"], "Seq Scan on employees")
+
+
+    # *****************************************
+    # *                                       *
+    # *  Test Incremental Sum of Values      *
+    # *                                       *
+    # *****************************************
+
+    def test_sum_of_values_incremental_reads_running_total(self):
+        """
+        Test incremental sum of values with a running total installed.
+
+        Verifies:
+            - The maintained total is returned without running SUM over the table.
+        """
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connection = MagicMock()
+            mock_connection.cursor().fetchone.return_value = (1000.0, 4)
+            mock_connect.return_value = mock_connection
+            result = sum_of_values('employees', 'salary', incremental=True)
+            self.assertEqual(result, 1000.0)
+            statements = repr(mock_connection.cursor().execute.call_args_list)
+            self.assertIn('running_totals', statements)
+            self.assertNotIn('SUM(salary)', statements)
+
+    def test_sum_of_values_incremental_falls_back_to_scan(self):
+        """
+        Test incremental sum of values without a running total.
+
+        Verifies:
+            - A full SUM is run when no summary row exists.
+        """
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connection = MagicMock()
+            mock_connection.cursor().fetchone.side_effect = [('running_totals',), None, [1000.0]]
+            mock_connect.return_value = mock_connection
+            result = sum_of_values('employees', 'salary', incremental=True)
+            self.assertEqual(result, 1000.0)
+            self.assertIn('SUM(salary)', repr(mock_connection.cursor().execute.call_args_list))
+
+    def test_sum_of_values_incremental_without_running_totals_table(self):
+        """
+        Test incremental sum of values before any running total was installed.
+
+        Verifies:
+            - The running_totals table is not queried when it does not exist.
+            - The full SUM is returned instead of an invalid-table error.
+        """
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connection = MagicMock()
+            mock_connection.cursor().fetchone.side_effect = [(None,), [1000.0]]
+            mock_connect.return_value = mock_connection
+            result = sum_of_values('employees', 'salary', incremental=True)
+            self.assertEqual(result, 1000.0)
+            statements = repr(mock_connection.cursor().execute.call_args_list)
+            self.assertIn('to_regclass', statements)
+            self.assertNotIn('FROM running_totals', statements)
+            self.assertIn('SUM(salary)', statements)
+
+    def test_install_running_total(self):
+        """
+        Test installation of the running-total triggers.
+
+        Verifies:
+            - Insert, update, delete and truncate triggers are created in one committed transaction.
+        """
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connection = MagicMock()
+            mock_connect.return_value = mock_connection
+            self.assertTrue(install_running_total('employees', 'salary'))
+            statements = repr(mock_connection.cursor().execute.call_args_list)
+            for event in ('insert', 'update', 'delete', 'truncate'):
+                self.assertIn(f"employees_salary_running_total_{event}", statements)
+            mock_connection.commit.assert_called_once()
+
+
+class TestAsyncPostgreSQLDBFunctions(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        close_db_pool()
+        disable_query_cache()
+
+    def tearDown(self):
+        close_db_pool()
+
+    async def test_async_sum_of_values(self):
+        """
+        Test the async sum of values.
+
+        Verifies:
+            - The result matches the blocking function.
+        """
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connection = MagicMock()
+            mock_connection.cursor().fetchone.return_value = [1000.0]
+            mock_connect.return_value = mock_connection
+            self.assertEqual(await async_sum_of_values('employees', 'salary'), 1000.0)
+
+    async def test_async_calculate_age(self):
+        """
+        Test the async age calculation.
+
+        Verifies:
+            - The result matches the blocking function.
+        """
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connection = MagicMock()
+            mock_connection.cursor().fetchmany.side_effect = [[(1, '30 years')], []]
+            mock_connect.return_value = mock_connection
+            self.assertEqual(await async_calculate_age('employees', 'birthdate', 1), '30 years')
+
+    async def test_gather_aggregates_runs_concurrently(self):
+        """
+        Test the bulk aggregate helper.
+
+        Verifies:
+            - Requests run on separate pooled connections at the same time.
+            - Results are returned in request order.
+        """
+        started = threading.Barrier(2, timeout=5)
+
+        def make_connection(*args, **kwargs):
+            connection = MagicMock()
+            table = {}
+
+            def execute(query, params=None):
+                table['name'] = 'departments' if 'departments' in repr(query) else 'employees'
+                started.wait()
+
+            connection.cursor().execute.side_effect = execute
+            connection.cursor().fetchall.side_effect = lambda: [(table['name'],)]
+            return connection
+
+        with patch('psycopg2.connect', side_effect=make_connection):
+            configure_db_pool(min_size=0, max_size=2)
+            results = await gather_aggregates([
+                ('employees', [('SUM', 'salary')]),
+                ('departments', [('COUNT', '*')]),
+            ])
+        self.assertEqual(results, [[('employees',)], [('departments',)]])
+
 
 if __name__ == "__main__":
     unittest.main()
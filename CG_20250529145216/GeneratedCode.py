@@ -7,15 +7,25 @@ python
 # *****************************************
 
 import requests
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # Standard Library Imports
-from typing import Dict, List
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 # Related Third-Party Imports
 from urllib.parse import urljoin
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Local Application/Library-Specific Imports
 from config import API_BASE_URL, API_KEY, DATE_FORMAT_STANDARD
@@ -30,71 +40,517 @@ DATE_FORMAT_STANDARD: str = "%Y-%m-%d %H:%M:%S"
 MISSING_VALUE_IMPUTATION_ENDPOINT: str = "impute/missing/values"
 DATE_COLUMN_VERIFICATION_ENDPOINT: str = "verify/date/column"
 DATE_FORMAT_CONVERSION_ENDPOINT: str = "convert/date/format"
+REQUEST_TIMEOUT: Tuple[float, float] = (3.05, 60.0)  # (connect, read) seconds
+HTTP_POOL_SIZE: int = 10  # kept-alive connections per host
+HTTP_MAX_RETRIES: int = 3
+HTTP_BACKOFF_FACTOR: float = 0.5  # sleeps 0.5s, 1s, 2s, ... between retries
+HTTP_RETRY_STATUSES: Tuple[int, ...] = (429, 500, 502, 503, 504)
+IMPUTATION_MAX_WORKERS: int = 4  # concurrent batch uploads; keep at or below HTTP_POOL_SIZE
+RESPONSE_CACHE_ENABLED: bool = False  # opt in here or with set_response_cache(); cached answers are never re-checked
+RESPONSE_CACHE_ENTRIES: int = 256  # in-memory LRU entries
+RESPONSE_CACHE_PATH: Optional[str] = None  # SQLite file of the on-disk tier; None keeps the cache in memory only
+RESPONSE_CACHE_TTL: float = 7 * 24 * 3600.0  # seconds an entry stays valid in either tier
+RESPONSE_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # on-disk tier size limit, least recently used entries go first
+DATE_SAMPLE_SIZE: int = 1000  # non-null values parsed by the local date column check
+DATE_LIKENESS_THRESHOLD: float = 0.9  # share of sampled values that must parse as dates
+DATE_COLUMN_CHECK_ENTRIES: int = 1024  # cached verify_date_column() results, least recently used go first
+
+_session: Optional[requests.Session] = None
+_response_cache: Optional["ResponseCache"] = None
+_shared_state_lock = threading.Lock()  # guards first-use creation of _session and _response_cache
+_date_column_checks: "OrderedDict[Tuple, bool]" = OrderedDict()  # (column, schema, remote, threshold, content) -> result
+_date_column_checks_lock = threading.Lock()
+
+
+# *****************************************
+# Response Cache
+# *****************************************
+
+def response_cache_key(endpoint: str, data: Any = None) -> str:
+    """
+    Builds a content address for an API call from the endpoint and the canonical JSON payload.
+
+    Keys are sorted and separators fixed, so equal payloads hash equally
+    whatever their dict order. Values JSON cannot encode are hashed by str().
+
+    Args:
+    - endpoint (str): API endpoint URL.
+    - data (Any, optional): Request payload. Defaults to None.
+
+    Returns:
+    - str: SHA-256 hex digest.
+    """
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{urljoin(API_BASE_URL, endpoint)}\n{payload}".encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier cache of API responses: an in-memory LRU in front of an optional SQLite file.
+
+    Entries expire ttl seconds after they were stored. The SQLite tier keeps
+    the JSON text of each response and, when it grows past max_bytes, drops
+    the least recently used entries. Safe to share between threads.
+
+    Args:
+    - max_entries (int, optional): In-memory entries. Defaults to RESPONSE_CACHE_ENTRIES.
+    - path (Optional[str], optional): SQLite file; None disables the on-disk tier. Defaults to RESPONSE_CACHE_PATH.
+    - ttl (float, optional): Entry lifetime in seconds. Defaults to RESPONSE_CACHE_TTL.
+    - max_bytes (int, optional): On-disk size limit. Defaults to RESPONSE_CACHE_MAX_BYTES.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_ENTRIES,
+        path: Optional[str] = RESPONSE_CACHE_PATH,
+        ttl: float = RESPONSE_CACHE_TTL,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Looks a response up in memory, then on disk.
+
+        Args:
+        - key (str): Key from response_cache_key().
+
+        Returns:
+        - Optional[Any]: Cached response, or None on a miss. Treat it as read-only.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[0] <= self.ttl:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._memory.pop(key, None)
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and now - row[1] <= self.ttl:
+                    self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                    self._db.commit()
+                    value = json.loads(row[0])
+                    self._remember(key, row[1], value)
+                    self.hits += 1
+                    return value
+                if row is not None:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Stores a response in both tiers.
+
+        Args:
+        - key (str): Key from response_cache_key().
+        - value (Any): JSON-compatible response.
+        """
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            if self._db is None:
+                return
+            text = json.dumps(value)
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, text, len(text), now, now),
+            )
+            self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                # Walk the entries from least to most recently used until enough bytes are freed
+                excess, cutoff = total - self.max_bytes, None
+                for accessed, size in self._db.execute("SELECT accessed, size FROM responses ORDER BY accessed"):
+                    excess, cutoff = excess - size, accessed
+                    if excess <= 0:
+                        break
+                self._db.execute("DELETE FROM responses WHERE accessed <= ?", (cutoff,))
+            self._db.commit()
+
+    def clear(self) -> None:
+        """
+        Removes every entry from both tiers.
+        """
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def _remember(self, key: str, created: float, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Returns the shared response cache, creating it on first use if RESPONSE_CACHE_ENABLED is on.
+
+    Returns:
+    - Optional[ResponseCache]: Cache used by get_api_response(), or None when none was set and RESPONSE_CACHE_ENABLED is off.
+    """
+    global _response_cache
+    if _response_cache is None and RESPONSE_CACHE_ENABLED:
+        with _shared_state_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache()
+    return _response_cache
+
+
+def set_response_cache(cache: Optional[ResponseCache]) -> Optional[ResponseCache]:
+    """
+    Replaces the shared response cache, e.g. with one backed by a SQLite file.
+
+    Args:
+    - cache (Optional[ResponseCache]): New cache, or None to go back to the default set by RESPONSE_CACHE_ENABLED.
+
+    Returns:
+    - Optional[ResponseCache]: The previous cache.
+    """
+    global _response_cache
+    with _shared_state_lock:
+        previous, _response_cache = _response_cache, cache
+    return previous
 
 
 # *****************************************
 # Function Definitions
 # *****************************************
 
-def get_api_response(endpoint: str, data: Dict[str, str] = None) -> Dict[str, str]:
+def create_session(
+    pool_size: int = HTTP_POOL_SIZE,
+    max_retries: int = HTTP_MAX_RETRIES,
+    backoff_factor: float = HTTP_BACKOFF_FACTOR,
+) -> requests.Session:
     """
-    Fetches API response for the given endpoint.
+    Creates an HTTP session with a keep-alive connection pool and retries.
+
+    Connection errors and HTTP_RETRY_STATUSES responses are retried with
+    exponential backoff, honouring Retry-After. POST is retried as well
+    because the API endpoints do not change server state.
+
+    Args:
+    - pool_size (int, optional): Connections kept per host. Defaults to HTTP_POOL_SIZE.
+    - max_retries (int, optional): Retries per request. Defaults to HTTP_MAX_RETRIES.
+    - backoff_factor (float, optional): Backoff base in seconds. Defaults to HTTP_BACKOFF_FACTOR.
+
+    Returns:
+    - requests.Session: Configured session.
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=HTTP_RETRY_STATUSES,
+        allowed_methods=None,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Returns the shared HTTP session, creating it on first use.
+
+    Creation is locked, so worker threads that race on the first call all
+    get the same session and connection pool.
+
+    Returns:
+    - requests.Session: Session used by every API helper.
+    """
+    global _session
+    if _session is None:
+        with _shared_state_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def set_session(session: Optional[requests.Session]) -> Optional[requests.Session]:
+    """
+    Replaces the shared HTTP session, e.g. with one pointed at a stub server in tests.
+
+    Args:
+    - session (Optional[requests.Session]): New session, or None to create a default one on next use.
+
+    Returns:
+    - Optional[requests.Session]: The previous session.
+    """
+    global _session
+    with _shared_state_lock:
+        previous, _session = _session, session
+    return previous
+
+
+def get_api_response(
+    endpoint: str,
+    data: Dict[str, str] = None,
+    timeout: Tuple[float, float] = REQUEST_TIMEOUT,
+    use_cache: bool = True,
+) -> Dict[str, str]:
+    """
+    Fetches API response for the given endpoint over the shared session.
+
+    With a response cache enabled (see get_response_cache), responses are
+    cached by endpoint and payload content (see response_cache_key), so a
+    payload that was already sent, e.g. the same batch in a rerun, is
+    answered from the cache without a request.
 
     Args:
     - endpoint (str): API endpoint URL.
     - data (Dict[str, str], optional): Data to be sent with the request. Defaults to None.
+    - timeout (Tuple[float, float], optional): (connect, read) timeout in seconds. Defaults to REQUEST_TIMEOUT.
+    - use_cache (bool, optional): Look the response up in, and store it to, the response cache. Defaults to True.
 
     Returns:
     - Dict[str, str]: API response.
     """
     try:
-        response = requests.post(urljoin(API_BASE_URL, endpoint), headers=API_KEY_HEADER, json=data)
+        cache = get_response_cache() if use_cache else None
+        key = response_cache_key(endpoint, data) if cache is not None else None
+        if key is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = get_session().post(urljoin(API_BASE_URL, endpoint), headers=API_KEY_HEADER, json=data, timeout=timeout)
         response.raise_for_status()
-        return response.json()
+        result = response.json()
+        if key is not None:
+            cache.put(key, result)
+        return result
     except requests.exceptions.RequestException as err:
         logging.error(f"API Request Error: {err}")
         raise
 
 
-def impute_missing_values(dataset: pd.DataFrame) -> pd.DataFrame:
+def _to_records(frame: pd.DataFrame) -> List[Dict]:
+    """
+    Converts a DataFrame to JSON-safe records, with missing values as null.
+
+    Args:
+    - frame (pd.DataFrame): Frame to convert.
+
+    Returns:
+    - List[Dict]: One dict per row.
+    """
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient="records")
+
+
+def _impute_batch(batch: pd.DataFrame) -> pd.DataFrame:
+    """
+    Imputes one batch through the API and checks that every row came back.
+
+    Args:
+    - batch (pd.DataFrame): Rows to impute.
+
+    Returns:
+    - pd.DataFrame: Imputed rows, in the order they were sent.
+    """
+    imputed = pd.DataFrame(get_api_response(MISSING_VALUE_IMPUTATION_ENDPOINT, _to_records(batch)))
+    if len(imputed) != len(batch):
+        raise ValueError(f"Imputation returned {len(imputed)} rows for a batch of {len(batch)}")
+    return imputed
+
+
+def impute_missing_values(
+    dataset: pd.DataFrame,
+    batch_size: Optional[int] = None,
+    key_columns: Optional[List[str]] = None,
+    max_workers: int = IMPUTATION_MAX_WORKERS,
+    sparse: bool = False,
+) -> pd.DataFrame:
     """
     Imputes missing values in the dataset using the API.
 
+    Without batch_size or sparse the whole dataset is sent in one request.
+    Otherwise only the columns that contain missing values, plus key_columns,
+    are sent, in batches of batch_size rows uploaded concurrently by
+    max_workers threads over the shared session. The imputed columns are
+    written back into a copy of the dataset in the original row order.
+
+    In sparse mode only the rows with a missing value are sent and the
+    returned values are written into the missing cells of the dataset in
+    place, so payload and parsing scale with the missing rows.
+
     Args:
     - dataset (pd.DataFrame): Input dataset.
+    - batch_size (Optional[int], optional): Rows per request. Defaults to None (single request).
+    - key_columns (Optional[List[str]], optional): Columns always sent for context. Defaults to None.
+    - max_workers (int, optional): Concurrent uploads in batched mode. Defaults to IMPUTATION_MAX_WORKERS.
+    - sparse (bool, optional): Send only affected rows and patch the dataset in place. Defaults to False.
 
     Returns:
-    - pd.DataFrame: Dataset with imputed missing values.
+    - pd.DataFrame: Dataset with imputed missing values (the input dataset itself in sparse mode).
     """
     try:
-        data = dataset.to_dict(orient="records")
-        response = get_api_response(MISSING_VALUE_IMPUTATION_ENDPOINT, data)
-        return pd.DataFrame(response)
+        if batch_size is None and not sparse:
+            data = dataset.to_dict(orient="records")
+            response = get_api_response(MISSING_VALUE_IMPUTATION_ENDPOINT, data)
+            return pd.DataFrame(response)
+
+        missing = dataset.isna()
+        missing_columns = list(dataset.columns[missing.any(axis=0).to_numpy()])
+        if not missing_columns:
+            return dataset if sparse else dataset.copy()
+        key_columns = [column for column in key_columns or [] if column not in missing_columns]
+        payload = dataset[key_columns + missing_columns]
+        if sparse:
+            rows = np.flatnonzero(missing.any(axis=1).to_numpy())
+            payload = payload.iloc[rows]
+        batch_size = batch_size or len(payload)
+        batches = [payload.iloc[start:start + batch_size] for start in range(0, len(payload), batch_size)]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            imputed = pd.concat(list(executor.map(_impute_batch, batches)), ignore_index=True)
+
+        if sparse:
+            for column in missing_columns:
+                cells = missing[column].to_numpy()[rows]
+                dataset.iloc[rows[cells], dataset.columns.get_loc(column)] = imputed[column].to_numpy()[cells]
+            return dataset
+
+        result = dataset.copy()
+        for column in missing_columns:
+            result[column] = imputed[column].to_numpy()
+        return result
     except Exception as err:
         logging.error(f"Missing Value Imputation Error: {err}")
         raise
 
 
-def verify_date_column(dataset: pd.DataFrame, date_column_name: str) -> bool:
+def _is_date_like(values: pd.Series, threshold: float) -> bool:
     """
-    Verifies the presence of a designated date column in the dataset via API.
+    Checks whether a column holds dates by parsing a sample of its values.
+
+    Args:
+    - values (pd.Series): Column to check.
+    - threshold (float): Share of sampled non-null values that must parse.
+
+    Returns:
+    - bool: True for datetime columns and text columns whose sample parses well enough.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return True
+    if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        return False
+    values = values.dropna()
+    if values.empty:
+        return False
+    if len(values) > DATE_SAMPLE_SIZE:
+        values = values.sample(n=DATE_SAMPLE_SIZE, random_state=0)
+    values = values.astype(str)
+    parsed = pd.to_datetime(values, format="ISO8601", errors="coerce", utc=True)
+    unparsed = values[parsed.isna()]
+    parsed_count = parsed.notna().sum() + pd.to_datetime(unparsed, format="mixed", errors="coerce", utc=True).notna().sum()
+    return parsed_count / len(values) >= threshold
+
+
+def _column_digest(values: pd.Series) -> str:
+    """
+    Hashes a column's values (not its index) for the verification cache.
+    """
+    try:
+        hashes = pd.util.hash_pandas_object(values, index=False)
+    except TypeError:
+        # Unhashable cells such as lists or dicts: hash their text instead.
+        hashes = pd.util.hash_pandas_object(values.astype(str), index=False)
+    return hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()
+
+
+def verify_date_column(
+    dataset: pd.DataFrame,
+    date_column_name: str,
+    remote: bool = False,
+    threshold: float = DATE_LIKENESS_THRESHOLD,
+) -> bool:
+    """
+    Verifies the presence of a designated date column in the dataset.
+
+    The check runs locally: the column must exist and be a datetime column,
+    or at least threshold of a DATE_SAMPLE_SIZE sample of its values must
+    parse as dates (ISO 8601 first, other layouts after). With remote=True
+    the dataset is sent to the verification API instead. Results are cached
+    per column, schema (column names and dtypes) and content: a digest of
+    the column's values locally, of the whole payload remotely (see
+    response_cache_key). The DATE_COLUMN_CHECK_ENTRIES most recently used
+    results are kept, and clear_date_column_checks() drops them all.
 
     Args:
     - dataset (pd.DataFrame): Input dataset.
     - date_column_name (str): Name of the date column to verify.
+    - remote (bool, optional): Ask the verification API. Defaults to False.
+    - threshold (float, optional): Parse success rate needed locally. Defaults to DATE_LIKENESS_THRESHOLD.
 
     Returns:
     - bool: True if the date column exists, False otherwise.
     """
     try:
-        data = {"dataset": dataset.to_dict(orient="records"), "date_column_name": date_column_name}
-        response = get_api_response(DATE_COLUMN_VERIFICATION_ENDPOINT, data)
-        return response["date_column_exists"]
+        schema = tuple((str(column), str(dtype)) for column, dtype in dataset.dtypes.items())
+        data, content = None, None
+        if remote:
+            data = {"dataset": dataset.to_dict(orient="records"), "date_column_name": date_column_name}
+            content = response_cache_key(DATE_COLUMN_VERIFICATION_ENDPOINT, data)
+        elif date_column_name in dataset.columns:
+            content = _column_digest(dataset[date_column_name])
+        key = (date_column_name, schema, remote, threshold, content)
+        with _date_column_checks_lock:
+            if key in _date_column_checks:
+                _date_column_checks.move_to_end(key)
+                return _date_column_checks[key]
+
+        if remote:
+            response = get_api_response(DATE_COLUMN_VERIFICATION_ENDPOINT, data)
+            result = bool(response["date_column_exists"])
+        else:
+            result = bool(date_column_name in dataset.columns and _is_date_like(dataset[date_column_name], threshold))
+        with _date_column_checks_lock:
+            _date_column_checks[key] = result
+            _date_column_checks.move_to_end(key)
+            while len(_date_column_checks) > DATE_COLUMN_CHECK_ENTRIES:
+                _date_column_checks.popitem(last=False)
+        return result
     except Exception as err:
         logging.error(f"Date Column Verification Error: {err}")
         raise
 
 
+def clear_date_column_checks() -> None:
+    """
+    Forgets every cached verify_date_column() result.
+    """
+    with _date_column_checks_lock:
+        _date_column_checks.clear()
+
+
 def convert_date_format(dataset: pd.DataFrame, date_column_name: str) -> pd.DataFrame:
     """
     Converts the identified date column to a standardized datetime format using the API.
@@ -9,22 +9,71 @@ python
 import unittest
 from your_module import (  # Replace 'your_module' with the actual module name
     get_api_response, 
+    create_session,
+    get_session,
+    set_session,
+    ResponseCache,
+    response_cache_key,
+    set_response_cache,
     impute_missing_values, 
     verify_date_column, 
+    clear_date_column_checks,
     convert_date_format, 
     DATE_FORMAT_STANDARD, 
     MISSING_VALUE_IMPUTATION_ENDPOINT, 
     DATE_COLUMN_VERIFICATION_ENDPOINT, 
-    DATE_FORMAT_CONVERSION_ENDPOINT
+    DATE_FORMAT_CONVERSION_ENDPOINT,
+    REQUEST_TIMEOUT
 )
 import pandas as pd
 import requests
 import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, MagicMock
 from datetime import datetime
+from urllib.parse import urljoin
+
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    """Local stub of the API: answers 503 to the first `failures` requests, then echoes the JSON body."""
+
+    protocol_version = "HTTP/1.1"
+    failures = 0
+    requests_seen = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        type(self).requests_seen.append(self.client_address)
+        if type(self).failures > 0:
+            type(self).failures -= 1
+            status, payload = 503, b"{}"
+        else:
+            status, payload = 200, body
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
 
 class TestFullStackSoftwareEngineerFunctions(unittest.TestCase):
 
+    def setUp(self):
+        set_response_cache(None)
+        clear_date_column_checks()
+
+    def tearDown(self):
+        cache = set_response_cache(None)
+        if cache is not None:
+            cache.clear()
+
     # *****************************************
     # Test Cases for get_api_response
     # *****************************************
@@ -35,7 +84,8 @@ class TestFullStackSoftwareEngineerFunctions(unittest.TestCase):
         
         Verifies that the function returns the expected response when the API call is successful.
         """
-        with patch('requests.post') as mock_post:
+        with patch('your_module.get_session') as mock_get_session:
+            mock_post = mock_get_session.return_value.post
             mock_response = MagicMock()
             mock_response.json.return_value = {"key": "value"}
             mock_response.raise_for_status.return_value = None
@@ -44,7 +94,7 @@ class TestFullStackSoftwareEngineerFunctions(unittest.TestCase):
             endpoint = "test_endpoint"
             response = get_api_response(endpoint)
             self.assertEqual(response, {"key": "value"})
-            mock_post.assert_called_once_with(urljoin("YOUR_API_BASE_URL", endpoint), headers={"Authorization": "Bearer YOUR_API_KEY"}, json=None)
+            mock_post.assert_called_once_with(urljoin("YOUR_API_BASE_URL", endpoint), headers={"Authorization": "Bearer YOUR_API_KEY"}, json=None, timeout=REQUEST_TIMEOUT)
 
     def test_get_api_response_failure(self):
         """
@@ -52,7 +102,8 @@ class TestFullStackSoftwareEngineerFunctions(unittest.TestCase):
         
         Verifies that the function logs an error and raises an exception when the API call fails.
         """
-        with patch('requests.post') as mock_post:
+        with patch('your_module.get_session') as mock_get_session:
+            mock_post = mock_get_session.return_value.post
             mock_response = MagicMock()
             mock_response.raise_for_status.side_effect = requests.exceptions.RequestException("Test Error")
             mock_post.return_value = mock_response
@@ -62,6 +113,103 @@ class TestFullStackSoftwareEngineerFunctions(unittest.TestCase):
                 get_api_response(endpoint)
             self.assertEqual(logging.getLogger().level, logging.ERROR)
 
+    def test_get_api_response_retries_over_shared_session(self):
+        """
+        Test retries and connection reuse against a local stub server.
+        
+        Verifies that 503 responses are retried, every call reuses one kept-alive connection, and the helpers share the session.
+        """
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StubAPIHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        StubAPIHandler.failures, StubAPIHandler.requests_seen = 2, []
+        previous = set_session(create_session(backoff_factor=0))
+        try:
+            with patch('your_module.API_BASE_URL', f"http://127.0.0.1:{server.server_address[1]}/"):
+                self.assertEqual(get_api_response("echo", {"key": "value"}), {"key": "value"})
+                dataset = pd.DataFrame({"A": [1, 2]})
+                pd.testing.assert_frame_equal(impute_missing_values(dataset), dataset)
+            self.assertEqual(len(StubAPIHandler.requests_seen), 4)
+            self.assertEqual(len(set(StubAPIHandler.requests_seen)), 1)
+        finally:
+            set_session(previous)
+            server.shutdown()
+            server.server_close()
+
+    def test_get_session_is_created_once_across_threads(self):
+        """
+        Test first-use creation of the shared session from several threads.
+        
+        Verifies that threads racing on the first call share one session.
+        """
+        def slow_session(*args, **kwargs):
+            time.sleep(0.05)
+            return MagicMock()
+
+        previous = set_session(None)
+        try:
+            with patch('your_module.create_session', side_effect=slow_session) as mock_create_session:
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    sessions = list(executor.map(lambda _: get_session(), range(4)))
+            mock_create_session.assert_called_once()
+            self.assertEqual(len({id(session) for session in sessions}), 1)
+        finally:
+            set_session(previous)
+
+    def test_get_api_response_uses_response_cache(self):
+        """
+        Test the in-memory response cache.
+        
+        Verifies that a repeated payload is served from the cache, whatever its key order, and a new payload is sent.
+        """
+        previous = set_response_cache(ResponseCache())
+        try:
+            with patch('your_module.get_session') as mock_get_session:
+                mock_post = mock_get_session.return_value.post
+                mock_post.return_value.json.return_value = {"key": "value"}
+                self.assertEqual(get_api_response("test_endpoint", {"a": 1, "b": 2}), {"key": "value"})
+                self.assertEqual(get_api_response("test_endpoint", {"b": 2, "a": 1}), {"key": "value"})
+                self.assertEqual(mock_post.call_count, 1)
+                get_api_response("test_endpoint", {"a": 1, "b": 3})
+                get_api_response("test_endpoint", {"a": 1, "b": 2}, use_cache=False)
+                self.assertEqual(mock_post.call_count, 3)
+        finally:
+            set_response_cache(previous)
+
+    def test_get_api_response_failure_after_success_is_not_cached(self):
+        """
+        Test that the response cache is off by default.
+        
+        Verifies that a failure is raised even after an earlier success for the same payload.
+        """
+        with patch('your_module.get_session') as mock_get_session:
+            mock_post = mock_get_session.return_value.post
+            mock_post.return_value.json.return_value = {"key": "value"}
+            self.assertEqual(get_api_response("test_endpoint", {"a": 1}), {"key": "value"})
+            mock_post.return_value.raise_for_status.side_effect = requests.exceptions.RequestException("Test Error")
+            with self.assertRaises(requests.exceptions.RequestException):
+                get_api_response("test_endpoint", {"a": 1})
+            self.assertEqual(mock_post.call_count, 2)
+
+    def test_response_cache_disk_tier(self):
+        """
+        Test the SQLite tier of the response cache.
+        
+        Verifies that entries survive a new cache instance, expire after the TTL, and are evicted past the size limit.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "responses.sqlite")
+            key = response_cache_key("test_endpoint", {"a": 1})
+            ResponseCache(path=path).put(key, [{"a": 1}])
+            self.assertEqual(ResponseCache(path=path).get(key), [{"a": 1}])
+            self.assertIsNone(ResponseCache(path=path, ttl=-1).get(key))
+            self.assertIsNone(ResponseCache(path=path).get(key))
+
+            cache = ResponseCache(max_entries=0, path=path, max_bytes=30)
+            cache.put("first", "x" * 20)
+            cache.put("second", "y" * 20)
+            self.assertIsNone(cache.get("first"))
+            self.assertEqual(cache.get("second"), "y" * 20)
+
     # *****************************************
     # Test Cases for impute_missing_values
     # *****************************************
@@ -81,6 +229,54 @@ class TestFullStackSoftwareEngineerFunctions(unittest.TestCase):
             imputed_dataset = impute_missing_values(dataset)
             pd.testing.assert_frame_equal(imputed_dataset, expected_output)
 
+    def test_impute_missing_values_batched(self):
+        """
+        Test batched, concurrent missing value imputation.
+        
+        Verifies that only key and NaN columns are sent in batches and that the imputed values are reassembled in row order.
+        """
+        dataset = pd.DataFrame({
+            "id": range(10),
+            "A": [1.0, None, 3.0, 4.0, None, 6.0, 7.0, 8.0, None, 10.0],
+            "B": ["x"] * 10,
+        })
+        payloads = []
+
+        def impute(endpoint, records):
+            payloads.append(records)
+            return [{**record, "A": -1.0 if record["A"] is None else record["A"]} for record in records]
+
+        with patch('your_module.get_api_response', side_effect=impute):
+            imputed_dataset = impute_missing_values(dataset, batch_size=3, key_columns=["id"], max_workers=2)
+
+        self.assertEqual(len(payloads), 4)
+        self.assertTrue(all(set(record) == {"id", "A"} for payload in payloads for record in payload))
+        self.assertEqual(imputed_dataset["A"].tolist(), [1.0, -1.0, 3.0, 4.0, -1.0, 6.0, 7.0, 8.0, -1.0, 10.0])
+        pd.testing.assert_frame_equal(imputed_dataset[["id", "B"]], dataset[["id", "B"]])
+
+    def test_impute_missing_values_sparse(self):
+        """
+        Test sparse missing value imputation.
+        
+        Verifies that only rows with missing values are sent and the imputed cells are patched into the dataset in place.
+        """
+        dataset = pd.DataFrame({"id": range(1000), "A": [float(i) for i in range(1000)], "B": ["x"] * 1000})
+        dataset.loc[[3, 700], "A"] = None
+        dataset.loc[700, "B"] = None
+        payloads = []
+
+        def impute(endpoint, records):
+            payloads.append(records)
+            return [{"id": record["id"], "A": -1.0, "B": "y"} for record in records]
+
+        with patch('your_module.get_api_response', side_effect=impute):
+            imputed_dataset = impute_missing_values(dataset, key_columns=["id"], sparse=True)
+
+        self.assertIs(imputed_dataset, dataset)
+        self.assertEqual(payloads, [[{"id": 3, "A": None, "B": "x"}, {"id": 700, "A": None, "B": None}]])
+        self.assertEqual(dataset.loc[[2, 3, 700], "A"].tolist(), [2.0, -1.0, -1.0])
+        self.assertEqual(dataset.loc[[3, 700], "B"].tolist(), ["x", "y"])
+
     def test_impute_missing_values_failure(self):
         """
         Test failed missing value imputation.
@@ -130,6 +326,64 @@ class TestFullStackSoftwareEngineerFunctions(unittest.TestCase):
             result = verify_date_column(dataset, date_column_name)
             self.assertFalse(result)
 
+    def test_verify_date_column_locally(self):
+        """
+        Test local date column verification.
+        
+        Verifies that date-like text passes the sampled parse check, other columns fail it, no API call is made, and results are cached per schema and content.
+        """
+        dataset = pd.DataFrame({
+            "dates": ["2022-01-01", "2022-01-02 10:00:00", "Jan 3 2022", None],
+            "words": ["a", "b", "2022-01-01", "d"],
+            "numbers": [1, 2, 3, 4],
+        })
+        with patch('your_module.get_api_response') as mock_api_response:
+            self.assertTrue(verify_date_column(dataset, "dates"))
+            self.assertFalse(verify_date_column(dataset, "words"))
+            self.assertTrue(verify_date_column(dataset, "words", threshold=0.25))
+            self.assertFalse(verify_date_column(dataset, "numbers"))
+            self.assertFalse(verify_date_column(dataset, "missing"))
+            mock_api_response.assert_not_called()
+
+            with patch('your_module._is_date_like') as mock_is_date_like:
+                self.assertTrue(verify_date_column(dataset.copy(), "dates"))
+                mock_is_date_like.assert_not_called()
+
+            changed = dataset.assign(dates=["a", "b", "c", "d"])
+            self.assertEqual(changed.dtypes.tolist(), dataset.dtypes.tolist())
+            self.assertFalse(verify_date_column(changed, "dates"))
+            self.assertTrue(verify_date_column(dataset, "dates"))
+
+            mock_api_response.return_value = {"date_column_exists": True}
+            self.assertTrue(verify_date_column(dataset, "words", remote=True))
+            self.assertTrue(verify_date_column(dataset, "words", remote=True))
+            mock_api_response.assert_called_once()
+
+    def test_verify_date_column_cache_is_bounded(self):
+        """
+        Test the verification result cache.
+        
+        Verifies that remote results are keyed by content, old entries are evicted past the limit, and the cache can be cleared.
+        """
+        first = pd.DataFrame({"words": ["a", "b"]})
+        second = pd.DataFrame({"words": ["c", "d"]})
+        with patch('your_module.get_api_response') as mock_api_response, \
+                patch('your_module.DATE_COLUMN_CHECK_ENTRIES', 2):
+            mock_api_response.side_effect = lambda endpoint, data: {"date_column_exists": data["dataset"][0]["words"] == "a"}
+            self.assertTrue(verify_date_column(first, "words", remote=True))
+            self.assertFalse(verify_date_column(second, "words", remote=True))
+            self.assertTrue(verify_date_column(first, "words", remote=True))
+            self.assertEqual(mock_api_response.call_count, 2)
+
+            self.assertFalse(verify_date_column(first, "missing"))
+            self.assertTrue(verify_date_column(first, "words", remote=True))
+            self.assertFalse(verify_date_column(second, "words", remote=True))
+            self.assertEqual(mock_api_response.call_count, 3)
+
+            clear_date_column_checks()
+            self.assertTrue(verify_date_column(first, "words", remote=True))
+            self.assertEqual(mock_api_response.call_count, 4)
+
     def test_verify_date_column_failure(self):
         """
         Test failed date column existence verification.
@@ -143,7 +397,7 @@ class TestFullStackSoftwareEngineerFunctions(unittest.TestCase):
             mock_api_response.side_effect = Exception("Test Error")
             
             with self.assertRaises(Exception):
-                verify_date_column(dataset, date_column_name)
+                verify_date_column(dataset, date_column_name, remote=True)
             self.assertEqual(logging.getLogger().level, logging.ERROR)
 
     # *****************************************